@@ -0,0 +1,55 @@
+import numpy as np
+
+# algorithms/binning.py
+MAX_BINS = 255
+
+
+class BinMapper:
+    """
+    Quantizes each feature into at most max_bins uint8 bins (histogram training mode)
+
+    bin_thresholds_[f] holds the increasing upper edges of the bins of feature f:
+    a value x falls in bin b = number of edges < x, so x <= bin_thresholds_[f][b]
+    exactly when its bin is <= b. A split found on binned data can therefore be
+    stored as a raw float threshold and applied to unbinned rows. NaN goes to
+    the last bin (and to the right of every threshold at predict time).
+    """
+    def __init__(self, max_bins=MAX_BINS, subsample=200_000, random_state=0):
+        if not 2 <= max_bins <= MAX_BINS:
+            raise ValueError(f"max_bins must be between 2 and {MAX_BINS}, got {max_bins}")
+        self.max_bins = max_bins
+        self.subsample = subsample
+        self.random_state = random_state
+
+    def fit(self, X):
+        X = np.asarray(X)
+        if self.subsample is not None and X.shape[0] > self.subsample:
+            rows = np.random.default_rng(self.random_state).choice(X.shape[0], self.subsample, replace=False)
+            X = X[rows]
+
+        self.bin_thresholds_ = []
+        for feature in range(X.shape[1]):
+            values = X[:, feature].astype(np.float64)
+            values = values[~np.isnan(values)]
+            distinct = np.unique(values)
+            if len(distinct) <= self.max_bins:
+                # one bin per distinct value, cut halfway between neighbours
+                edges = (distinct[:-1] + distinct[1:]) / 2
+            else:
+                quantiles = np.linspace(0, 100, self.max_bins + 1)[1:-1]
+                edges = np.unique(np.percentile(values, quantiles, method='midpoint'))
+            self.bin_thresholds_.append(edges)
+
+        self.n_bins_ = np.array([len(edges) + 1 for edges in self.bin_thresholds_])
+        return self
+
+    def transform(self, X):
+        X = np.asarray(X)
+        # column-major: split search and partitioning read one feature at a time
+        binned = np.empty(X.shape, dtype=np.uint8, order='F')
+        for feature, edges in enumerate(self.bin_thresholds_):
+            binned[:, feature] = np.searchsorted(edges, X[:, feature], side='left')
+        return binned
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
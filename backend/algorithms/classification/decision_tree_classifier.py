@@ -1,5 +1,6 @@
 import numpy as np
 from sklearn.base import BaseEstimator, ClassifierMixin
+from ..binning import BinMapper
 
 # algorithms/classification/decision_tree_classifier.py
 class Node:
@@ -16,11 +17,15 @@ class Node:
 class DecisionTreeClassifierCustom(BaseEstimator, ClassifierMixin):
     """
     Decision Tree Classifier using CART algorithm
+
+    With max_bins set, features are quantized once into at most max_bins
+    bins and splits are searched on per-node class-count histograms
+    (histogram mode) instead of sorted exact values.
     """
-    def __init__(self, max_depth=10, min_samples_split=2):
+    def __init__(self, max_depth=10, min_samples_split=2, max_bins=None):
         self.max_depth = max_depth
         self.min_samples_split = min_samples_split
-        self.root = None
+        self.max_bins = max_bins
         
     def gini(self, y):
         proportions = np.bincount(y) / len(y)
@@ -31,7 +36,21 @@ class DecisionTreeClassifierCustom(BaseEstimator, ClassifierMixin):
         right_mask = ~left_mask
         return X[left_mask], X[right_mask], y[left_mask], y[right_mask]
     
-    def best_split(self, X, y):
+    def best_split(self, X, y, idx=None):
+        """
+        Best (feature, threshold) for the samples idx (all rows by default).
+
+        Each feature is sorted once; cumulative class counts over the sorted
+        values give the Gini impurity of every threshold (each distinct value)
+        in one vectorized pass, O(n log n) per feature instead of a masked copy
+        of X and y per candidate. Ties keep the first feature/lowest threshold.
+        """
+        if idx is None:
+            idx = np.arange(len(y))
+        y_node = y[idx]
+        n_samples = len(idx)
+        n_classes = int(y_node.max()) + 1
+        total = np.bincount(y_node, minlength=n_classes)
         best_gini = float('inf')
         best_feature = None
         best_threshold = None
@@ -39,59 +58,220 @@ class DecisionTreeClassifierCustom(BaseEstimator, ClassifierMixin):
         n_features = X.shape[1]
         
         for feature in range(n_features):
-            thresholds = np.unique(X[:, feature])
+            values = X[idx, feature]
+            order = np.argsort(values, kind='stable')
+            sorted_values = values[order]
+            # a threshold between positions i and i+1 exists where the value changes;
+            # the max value (empty right side) is never a candidate
+            cuts = np.flatnonzero(sorted_values[:-1] < sorted_values[1:])
+            if len(cuts) == 0:
+                continue
+            
+            sorted_y = y_node[order]
+            left = np.empty((len(cuts), n_classes), dtype=np.int64)
+            for c in range(n_classes):
+                left[:, c] = np.cumsum(sorted_y == c)[cuts]
+            right = total - left
+            n_left = cuts + 1
+            n_right = n_samples - n_left
             
-            for threshold in thresholds:
-                X_left, X_right, y_left, y_right = self.split(X, y, feature, threshold)
-                
-                if len(y_left) == 0 or len(y_right) == 0:
-                    continue
-                
-                gini = (len(y_left) / len(y)) * self.gini(y_left) + \
-                       (len(y_right) / len(y)) * self.gini(y_right)
-                
-                if gini < best_gini:
-                    best_gini = gini
-                    best_feature = feature
-                    best_threshold = threshold
+            gini = (n_left / n_samples) * self._gini_rows(left, n_left) + \
+                   (n_right / n_samples) * self._gini_rows(right, n_right)
+            
+            i = int(np.argmin(gini))
+            if gini[i] < best_gini:
+                best_gini = gini[i]
+                best_feature = feature
+                best_threshold = sorted_values[cuts[i]]
         
         return best_feature, best_threshold
     
-    def build_tree(self, X, y, depth=0):
-        n_samples, n_features = X.shape
-        n_classes = len(np.unique(y))
+    def _gini_rows(self, counts, sizes):
+        # same arithmetic as gini() (class by class), one row per candidate threshold
+        proportions = counts / sizes[..., None]
+        squares = proportions[..., 0] ** 2
+        for c in range(1, counts.shape[-1]):
+            squares = squares + proportions[..., c] ** 2
+        return 1 - squares
+    
+    def build_tree(self, X, y, depth=0, idx=None):
+        if idx is None:
+            idx = np.arange(len(y))
+        y_node = y[idx]
+        n_samples = len(idx)
+        n_classes = len(np.unique(y_node))
         
         # Stopping criteria
         if depth >= self.max_depth or n_samples < self.min_samples_split or n_classes == 1:
-            leaf_value = np.argmax(np.bincount(y))
+            leaf_value = np.argmax(np.bincount(y_node))
             return Node(value=leaf_value)
         
         # Find best split
-        feature, threshold = self.best_split(X, y)
+        feature, threshold = self.best_split(X, y, idx)
         
         if feature is None:
-            leaf_value = np.argmax(np.bincount(y))
+            leaf_value = np.argmax(np.bincount(y_node))
             return Node(value=leaf_value)
         
-        # Split and recurse
-        X_left, X_right, y_left, y_right = self.split(X, y, feature, threshold)
-        left = self.build_tree(X_left, y_left, depth + 1)
-        right = self.build_tree(X_right, y_right, depth + 1)
+        # Partition the node's sample indices and recurse (X itself is never copied)
+        left_mask = X[idx, feature] <= threshold
+        left = self.build_tree(X, y, depth + 1, idx[left_mask])
+        right = self.build_tree(X, y, depth + 1, idx[~left_mask])
         
         return Node(feature, threshold, left, right)
     
-    def fit(self, X, y):
-        self.classes_ = np.unique(y)
-        self.root = self.build_tree(X, y)
+    def histogram(self, X_binned, y, idx):
+        """Class counts per (feature, bin) over the samples idx."""
+        n_bins = int(self.bin_mapper_.n_bins_.max())
+        n_features = X_binned.shape[1]
+        y_node = y[idx]
+        hist = np.empty((n_features, n_bins, self.n_classes_), dtype=np.int64)
+        for feature in range(n_features):
+            codes = X_binned[idx, feature].astype(np.intp) * self.n_classes_ + y_node
+            hist[feature] = np.bincount(codes, minlength=n_bins * self.n_classes_).reshape(n_bins, -1)
+        return hist
+    
+    def best_split_hist(self, hist):
+        """
+        Best (feature, bin, threshold) from a node histogram.
+
+        Splitting after bin b sends bins <= b left; cumulative counts over the
+        bins score every candidate of every feature at once. The threshold is
+        the upper edge of bin b, so the resulting tree predicts on raw values.
+        """
+        if hist.shape[1] < 2:
+            return None, None, None
+        
+        left = np.cumsum(hist, axis=1)[:, :-1]
+        total = hist[0].sum(axis=0)
+        right = total - left
+        n_samples = total.sum()
+        n_left = left.sum(axis=-1)
+        n_right = n_samples - n_left
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gini = (n_left / n_samples) * self._gini_rows(left, n_left) + \
+                   (n_right / n_samples) * self._gini_rows(right, n_right)
+        gini[(n_left == 0) | (n_right == 0)] = np.inf
+        
+        # first minimum in (feature, bin) order: lowest feature, then lowest threshold
+        best = int(np.argmin(gini))
+        feature, bin_ = divmod(best, gini.shape[1])
+        if not np.isfinite(gini[feature, bin_]):
+            return None, None, None
+        return feature, bin_, self.bin_mapper_.bin_thresholds_[feature][bin_]
+    
+    def build_tree_hist(self, X_binned, y, depth=0, idx=None, hist=None):
+        if idx is None:
+            idx = np.arange(len(y))
+        y_node = y[idx]
+        n_samples = len(idx)
+        n_classes = len(np.unique(y_node))
+        
+        # Stopping criteria
+        if depth >= self.max_depth or n_samples < self.min_samples_split or n_classes == 1:
+            leaf_value = np.argmax(np.bincount(y_node))
+            return Node(value=leaf_value)
+        
+        # Find best split
+        if hist is None:
+            hist = self.histogram(X_binned, y, idx)
+        feature, bin_, threshold = self.best_split_hist(hist)
+        
+        if feature is None:
+            leaf_value = np.argmax(np.bincount(y_node))
+            return Node(value=leaf_value)
+        
+        left_mask = X_binned[idx, feature] <= bin_
+        left_idx, right_idx = idx[left_mask], idx[~left_mask]
+        
+        # Subtraction trick: only the smaller child is histogrammed, its sibling
+        # is the parent minus it (children at max_depth are leaves and need none)
+        left_hist = right_hist = None
+        if depth + 1 < self.max_depth:
+            if len(left_idx) <= len(right_idx):
+                left_hist = self.histogram(X_binned, y, left_idx)
+                right_hist = hist - left_hist
+            else:
+                right_hist = self.histogram(X_binned, y, right_idx)
+                left_hist = hist - right_hist
+        
+        left = self.build_tree_hist(X_binned, y, depth + 1, left_idx, left_hist)
+        right = self.build_tree_hist(X_binned, y, depth + 1, right_idx, right_hist)
+        
+        return Node(feature, threshold, left, right)
+    
+    def fit(self, X, y, sample_indices=None):
+        """
+        Fit on X, y, or only on the rows sample_indices (repeats allowed, e.g. a
+        bootstrap sample) without copying X.
+        """
+        if self.max_bins is not None:
+            bin_mapper = BinMapper(self.max_bins).fit(X)
+            return self.fit_binned(bin_mapper.transform(X), y, bin_mapper, sample_indices)
+        
+        self.classes_ = np.unique(y if sample_indices is None else y[sample_indices])
+        self.flatten(self.build_tree(X, y, idx=sample_indices))
+        return self
+    
+    def fit_binned(self, X_binned, y, bin_mapper, sample_indices=None):
+        """Histogram-mode fit on features already quantized by bin_mapper (lets boosters bin X once)."""
+        self.classes_ = np.unique(y if sample_indices is None else y[sample_indices])
+        self.bin_mapper_ = bin_mapper
+        self.n_classes_ = int(np.max(y)) + 1
+        self.flatten(self.build_tree_hist(X_binned, y, idx=sample_indices))
         return self
     
-    def predict_sample(self, x, node):
-        if node.is_leaf():
-            return node.value
+    def flatten(self, root):
+        """
+        Store the fitted tree as parallel arrays (breadth-first node order).
+
+        feature_[i] is -1 for a leaf; otherwise rows with
+        x[feature_[i]] <= threshold_[i] go to children_left_[i], the others to
+        children_right_[i]. value_[i] is the leaf prediction. These arrays, not
+        the Node objects, are what is kept on the model and pickled.
+        """
+        nodes = [root]
+        feature, threshold, left, right, value = [], [], [], [], []
+        for node in nodes:
+            if node.is_leaf():
+                feature.append(-1)
+                threshold.append(np.nan)
+                left.append(-1)
+                right.append(-1)
+                value.append(node.value)
+            else:
+                feature.append(node.feature)
+                threshold.append(node.threshold)
+                left.append(len(nodes))
+                right.append(len(nodes) + 1)
+                nodes.extend((node.left, node.right))
+                value.append(0)
         
-        if x[node.feature] <= node.threshold:
-            return self.predict_sample(x, node.left)
-        return self.predict_sample(x, node.right)
+        self.feature_ = np.array(feature, dtype=np.intp)
+        self.threshold_ = np.array(threshold, dtype=np.float64)
+        self.children_left_ = np.array(left, dtype=np.intp)
+        self.children_right_ = np.array(right, dtype=np.intp)
+        self.value_ = np.array(value)
+        return self
+    
+    def predict_sample(self, x, node=0):
+        while self.feature_[node] >= 0:
+            if x[self.feature_[node]] <= self.threshold_[node]:
+                node = self.children_left_[node]
+            else:
+                node = self.children_right_[node]
+        return self.value_[node]
     
     def predict(self, X):
-        return np.array([self.predict_sample(x, self.root) for x in X])
+        # Level-synchronous traversal: every row still at an internal node moves
+        # one level down per iteration, so the Python loop runs max_depth times
+        X = np.asarray(X)
+        node = np.zeros(X.shape[0], dtype=np.intp)
+        active = np.flatnonzero(self.feature_[node] >= 0)
+        while len(active):
+            current = node[active]
+            go_left = X[active, self.feature_[current]] <= self.threshold_[current]
+            node[active] = np.where(go_left, self.children_left_[current], self.children_right_[current])
+            active = active[self.feature_[node[active]] >= 0]
+        return self.value_[node]
@@ -1,16 +1,21 @@
 import numpy as np
 from sklearn.base import BaseEstimator, ClassifierMixin
-from decision_tree_classifier import DecisionTreeClassifierCustom
+from ..binning import BinMapper
+from .decision_tree_classifier import DecisionTreeClassifierCustom
 
 # algorithms/classification/gradient_boosting_classifier.py
 class GradientBoostingClassifierCustom(BaseEstimator, ClassifierMixin):
     """
     Gradient Boosting Classifier
+
+    With max_bins set, X is quantized once and every tree is grown in
+    histogram mode on the shared binned matrix.
     """
-    def __init__(self, n_estimators=100, learning_rate=0.1, max_depth=3):
+    def __init__(self, n_estimators=100, learning_rate=0.1, max_depth=3, max_bins=None):
         self.n_estimators = n_estimators
         self.learning_rate = learning_rate
         self.max_depth = max_depth
+        self.max_bins = max_bins
         self.trees = []
         self.init_prediction = None
         
@@ -26,14 +31,21 @@ class GradientBoostingClassifierCustom(BaseEstimator, ClassifierMixin):
         
         F = np.full(len(y_binary), self.init_prediction)
         
+        if self.max_bins is not None:
+            self.bin_mapper_ = BinMapper(self.max_bins).fit(X)
+            X_binned = self.bin_mapper_.transform(X)
+        
         for _ in range(self.n_estimators):
             # Compute pseudo-residuals
             p = self.sigmoid(F)
             residuals = y_binary - p
             
             # Fit tree to residuals
-            tree = DecisionTreeClassifierCustom(max_depth=self.max_depth)
-            tree.fit(X, (residuals > 0).astype(int))
+            tree = DecisionTreeClassifierCustom(max_depth=self.max_depth, max_bins=self.max_bins)
+            if self.max_bins is not None:
+                tree.fit_binned(X_binned, (residuals > 0).astype(int), self.bin_mapper_)
+            else:
+                tree.fit(X, (residuals > 0).astype(int))
             
             # Update predictions
             predictions = tree.predict(X)
@@ -1,5 +1,6 @@
 import numpy as np
 from sklearn.base import BaseEstimator, ClassifierMixin
+from ..binning import BinMapper
 
 # algorithms/regression/decision_tree_regressor.py
 class NodeRegressor:
@@ -16,11 +17,16 @@ class NodeRegressor:
 class DecisionTreeRegressorCustom(BaseEstimator):
     """
     Decision Tree Regressor
+
+    With max_bins set, features are quantized once into at most max_bins
+    bins and splits are searched on per-node gradient/count histograms
+    (histogram mode) instead of sorted exact values.
     """
-    def __init__(self, max_depth=10, min_samples_split=2):
+    def __init__(self, max_depth=10, min_samples_split=2, min_samples_leaf=1, max_bins=None):
         self.max_depth = max_depth
         self.min_samples_split = min_samples_split
-        self.root = None
+        self.min_samples_leaf = min_samples_leaf
+        self.max_bins = max_bins
         
     def mse(self, y):
         if len(y) == 0:
@@ -32,65 +38,244 @@ class DecisionTreeRegressorCustom(BaseEstimator):
         right_mask = ~left_mask
         return X[left_mask], X[right_mask], y[left_mask], y[right_mask]
     
-    def best_split(self, X, y):
+    def best_split(self, X, y, idx=None):
+        """
+        Best (feature, threshold) for the samples idx (all rows by default).
+
+        Each feature is sorted once; prefix sums of y and y**2 over the sorted
+        values give the weighted variance of both sides of every threshold in
+        O(n) after the sort. Thresholds leaving fewer than min_samples_leaf
+        samples on either side are skipped. Ties keep the first feature/lowest
+        threshold.
+        """
+        if idx is None:
+            idx = np.arange(len(y))
+        # centering on the node mean keeps sum(y**2) - sum(y)**2 / n well conditioned
+        y_node = y[idx].astype(np.float64)
+        y_node = y_node - y_node.mean()
+        n_samples = len(idx)
+        min_leaf = max(1, self.min_samples_leaf)
         best_mse = float('inf')
         best_feature = None
         best_threshold = None
         
+        if n_samples < 2 * min_leaf:
+            return best_feature, best_threshold
+        
         n_features = X.shape[1]
         
         for feature in range(n_features):
-            thresholds = np.unique(X[:, feature])
+            values = X[idx, feature]
+            order = np.argsort(values, kind='stable')
+            sorted_values = values[order]
+            # a threshold between positions i and i+1 exists where the value changes
+            cuts = np.flatnonzero(sorted_values[:-1] < sorted_values[1:])
+            n_left = cuts + 1
+            n_right = n_samples - n_left
+            cuts = cuts[(n_left >= min_leaf) & (n_right >= min_leaf)]
+            if len(cuts) == 0:
+                continue
+            
+            sorted_y = y_node[order]
+            sum_y = np.cumsum(sorted_y)
+            sum_sq = np.cumsum(sorted_y ** 2)
+            left_sum, left_sq = sum_y[cuts], sum_sq[cuts]
+            right_sum, right_sq = sum_y[-1] - left_sum, sum_sq[-1] - left_sq
+            n_left = cuts + 1
+            n_right = n_samples - n_left
+            
+            # n_left/n * var(left) + n_right/n * var(right) == (SSE_left + SSE_right) / n
+            sse = (left_sq - left_sum ** 2 / n_left) + (right_sq - right_sum ** 2 / n_right)
+            mse = np.maximum(sse, 0) / n_samples
             
-            for threshold in thresholds:
-                X_left, X_right, y_left, y_right = self.split(X, y, feature, threshold)
-                
-                if len(y_left) == 0 or len(y_right) == 0:
-                    continue
-                
-                mse = (len(y_left) / len(y)) * self.mse(y_left) + \
-                      (len(y_right) / len(y)) * self.mse(y_right)
-                
-                if mse < best_mse:
-                    best_mse = mse
-                    best_feature = feature
-                    best_threshold = threshold
+            i = int(np.argmin(mse))
+            if mse[i] < best_mse:
+                best_mse = mse[i]
+                best_feature = feature
+                best_threshold = sorted_values[cuts[i]]
         
         return best_feature, best_threshold
     
-    def build_tree(self, X, y, depth=0):
-        n_samples = X.shape[0]
+    def build_tree(self, X, y, depth=0, idx=None):
+        if idx is None:
+            idx = np.arange(len(y))
+        y_node = y[idx]
+        n_samples = len(idx)
         
         # Stopping criteria
         if depth >= self.max_depth or n_samples < self.min_samples_split:
-            leaf_value = np.mean(y)
+            leaf_value = np.mean(y_node)
             return NodeRegressor(value=leaf_value)
         
         # Find best split
-        feature, threshold = self.best_split(X, y)
+        feature, threshold = self.best_split(X, y, idx)
         
         if feature is None:
-            leaf_value = np.mean(y)
+            leaf_value = np.mean(y_node)
             return NodeRegressor(value=leaf_value)
         
-        # Split and recurse
-        X_left, X_right, y_left, y_right = self.split(X, y, feature, threshold)
-        left = self.build_tree(X_left, y_left, depth + 1)
-        right = self.build_tree(X_right, y_right, depth + 1)
+        # Partition the node's sample indices and recurse (X itself is never copied)
+        left_mask = X[idx, feature] <= threshold
+        left = self.build_tree(X, y, depth + 1, idx[left_mask])
+        right = self.build_tree(X, y, depth + 1, idx[~left_mask])
         
         return NodeRegressor(feature, threshold, left, right)
     
-    def fit(self, X, y):
-        self.root = self.build_tree(X, y)
+    def histogram(self, X_binned, g, idx):
+        """Count, sum(g) and sum(g**2) per (feature, bin) over the samples idx."""
+        n_bins = int(self.bin_mapper_.n_bins_.max())
+        n_features = X_binned.shape[1]
+        g_node = g[idx]
+        g_sq = g_node ** 2
+        hist = np.empty((n_features, n_bins, 3), dtype=np.float64)
+        for feature in range(n_features):
+            bins = X_binned[idx, feature]
+            hist[feature, :, 0] = np.bincount(bins, minlength=n_bins)
+            hist[feature, :, 1] = np.bincount(bins, weights=g_node, minlength=n_bins)
+            hist[feature, :, 2] = np.bincount(bins, weights=g_sq, minlength=n_bins)
+        return hist
+    
+    def best_split_hist(self, hist):
+        """
+        Best (feature, bin, threshold) from a node histogram.
+
+        Splitting after bin b sends bins <= b left; cumulative sums over the
+        bins give the weighted variance of every candidate of every feature at
+        once. The threshold is the upper edge of bin b, so the resulting tree
+        predicts on raw values.
+        """
+        if hist.shape[1] < 2:
+            return None, None, None
+        
+        min_leaf = max(1, self.min_samples_leaf)
+        left = np.cumsum(hist, axis=1)[:, :-1]
+        total = hist[0].sum(axis=0)
+        n_left, left_sum, left_sq = left[..., 0], left[..., 1], left[..., 2]
+        n_right = total[0] - n_left
+        right_sum, right_sq = total[1] - left_sum, total[2] - left_sq
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sse = (left_sq - left_sum ** 2 / n_left) + (right_sq - right_sum ** 2 / n_right)
+        mse = np.maximum(sse, 0) / total[0]
+        mse[(n_left < min_leaf) | (n_right < min_leaf)] = np.inf
+        
+        # first minimum in (feature, bin) order: lowest feature, then lowest threshold
+        best = int(np.argmin(mse))
+        feature, bin_ = divmod(best, mse.shape[1])
+        if not np.isfinite(mse[feature, bin_]):
+            return None, None, None
+        return feature, bin_, self.bin_mapper_.bin_thresholds_[feature][bin_]
+    
+    def build_tree_hist(self, X_binned, y, g, depth=0, idx=None, hist=None):
+        if idx is None:
+            idx = np.arange(len(y))
+        n_samples = len(idx)
+        
+        # Stopping criteria
+        if depth >= self.max_depth or n_samples < self.min_samples_split:
+            leaf_value = np.mean(y[idx])
+            return NodeRegressor(value=leaf_value)
+        
+        # Find best split
+        if hist is None:
+            hist = self.histogram(X_binned, g, idx)
+        feature, bin_, threshold = self.best_split_hist(hist)
+        
+        if feature is None:
+            leaf_value = np.mean(y[idx])
+            return NodeRegressor(value=leaf_value)
+        
+        left_mask = X_binned[idx, feature] <= bin_
+        left_idx, right_idx = idx[left_mask], idx[~left_mask]
+        
+        # Subtraction trick: only the smaller child is histogrammed, its sibling
+        # is the parent minus it (children at max_depth are leaves and need none)
+        left_hist = right_hist = None
+        if depth + 1 < self.max_depth:
+            if len(left_idx) <= len(right_idx):
+                left_hist = self.histogram(X_binned, g, left_idx)
+                right_hist = hist - left_hist
+            else:
+                right_hist = self.histogram(X_binned, g, right_idx)
+                left_hist = hist - right_hist
+        
+        left = self.build_tree_hist(X_binned, y, g, depth + 1, left_idx, left_hist)
+        right = self.build_tree_hist(X_binned, y, g, depth + 1, right_idx, right_hist)
+        
+        return NodeRegressor(feature, threshold, left, right)
+    
+    def fit(self, X, y, sample_indices=None):
+        """
+        Fit on X, y, or only on the rows sample_indices (repeats allowed, e.g. a
+        bootstrap sample) without copying X.
+        """
+        if self.max_bins is not None:
+            bin_mapper = BinMapper(self.max_bins).fit(X)
+            return self.fit_binned(bin_mapper.transform(X), y, bin_mapper, sample_indices)
+        
+        self.flatten(self.build_tree(X, y, idx=sample_indices))
+        return self
+    
+    def fit_binned(self, X_binned, y, bin_mapper, sample_indices=None):
+        """Histogram-mode fit on features already quantized by bin_mapper (lets boosters bin X once)."""
+        y = np.asarray(y, dtype=np.float64)
+        self.bin_mapper_ = bin_mapper
+        # g: squared-loss gradient around the mean (variance is shift invariant,
+        # centering keeps sum(g**2) - sum(g)**2 / n well conditioned)
+        y_mean = np.mean(y if sample_indices is None else y[sample_indices])
+        self.flatten(self.build_tree_hist(X_binned, y, y - y_mean, idx=sample_indices))
         return self
     
-    def predict_sample(self, x, node):
-        if node.is_leaf():
-            return node.value
+    def flatten(self, root):
+        """
+        Store the fitted tree as parallel arrays (breadth-first node order).
+
+        feature_[i] is -1 for a leaf; otherwise rows with
+        x[feature_[i]] <= threshold_[i] go to children_left_[i], the others to
+        children_right_[i]. value_[i] is the leaf prediction. These arrays, not
+        the NodeRegressor objects, are what is kept on the model and pickled.
+        """
+        nodes = [root]
+        feature, threshold, left, right, value = [], [], [], [], []
+        for node in nodes:
+            if node.is_leaf():
+                feature.append(-1)
+                threshold.append(np.nan)
+                left.append(-1)
+                right.append(-1)
+                value.append(node.value)
+            else:
+                feature.append(node.feature)
+                threshold.append(node.threshold)
+                left.append(len(nodes))
+                right.append(len(nodes) + 1)
+                nodes.extend((node.left, node.right))
+                value.append(0)
         
-        if x[node.feature] <= node.threshold:
-            return self.predict_sample(x, node.left)
-        return self.predict_sample(x, node.right)
+        self.feature_ = np.array(feature, dtype=np.intp)
+        self.threshold_ = np.array(threshold, dtype=np.float64)
+        self.children_left_ = np.array(left, dtype=np.intp)
+        self.children_right_ = np.array(right, dtype=np.intp)
+        self.value_ = np.array(value)
+        return self
+    
+    def predict_sample(self, x, node=0):
+        while self.feature_[node] >= 0:
+            if x[self.feature_[node]] <= self.threshold_[node]:
+                node = self.children_left_[node]
+            else:
+                node = self.children_right_[node]
+        return self.value_[node]
     
     def predict(self, X):
-        return np.array([self.predict_sample(x, self.root) for x in X])
+        # Level-synchronous traversal: every row still at an internal node moves
+        # one level down per iteration, so the Python loop runs max_depth times
+        X = np.asarray(X)
+        node = np.zeros(X.shape[0], dtype=np.intp)
+        active = np.flatnonzero(self.feature_[node] >= 0)
+        while len(active):
+            current = node[active]
+            go_left = X[active, self.feature_[current]] <= self.threshold_[current]
+            node[active] = np.where(go_left, self.children_left_[current], self.children_right_[current])
+            active = active[self.feature_[node[active]] >= 0]
+        return self.value_[node]
@@ -1,15 +1,21 @@
 import numpy as np
 from sklearn.base import BaseEstimator, ClassifierMixin
-from decision_tree_regressor import DecisionTreeRegressorCustom
+from ..binning import BinMapper
+from .decision_tree_regressor import DecisionTreeRegressorCustom
 
 class GradientBoostingRegressorCustom(BaseEstimator):
     """
     Gradient Boosting Regressor
+
+    With max_bins set, X is quantized once and every tree is grown in
+    histogram mode on the shared binned matrix.
     """ 
-    def __init__(self, n_estimators=100, learning_rate=0.1, max_depth=3):
+    def __init__(self, n_estimators=100, learning_rate=0.1, max_depth=3, min_samples_leaf=1, max_bins=None):
         self.n_estimators = n_estimators
         self.learning_rate = learning_rate
         self.max_depth = max_depth
+        self.min_samples_leaf = min_samples_leaf
+        self.max_bins = max_bins
         self.trees = []
         self.init_prediction = None
         
@@ -19,13 +25,22 @@ class GradientBoostingRegressorCustom(BaseEstimator):
         
         F = np.full(len(y), self.init_prediction)
         
+        if self.max_bins is not None:
+            self.bin_mapper_ = BinMapper(self.max_bins).fit(X)
+            X_binned = self.bin_mapper_.transform(X)
+        
         for _ in range(self.n_estimators):
             # Compute pseudo-residuals
             residuals = y - F
             
             # Fit tree to residuals
-            tree = DecisionTreeRegressorCustom(max_depth=self.max_depth)
-            tree.fit(X, residuals)
+            tree = DecisionTreeRegressorCustom(max_depth=self.max_depth,
+                                               min_samples_leaf=self.min_samples_leaf,
+                                               max_bins=self.max_bins)
+            if self.max_bins is not None:
+                tree.fit_binned(X_binned, residuals, self.bin_mapper_)
+            else:
+                tree.fit(X, residuals)
             
             # Update predictions
             predictions = tree.predict(X)
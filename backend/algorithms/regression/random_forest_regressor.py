@@ -1,33 +1,69 @@
+import multiprocessing
+import os
+import tempfile
 import numpy as np
 from sklearn.base import BaseEstimator, ClassifierMixin
+from .decision_tree_regressor import DecisionTreeRegressorCustom
 
 # algorithms/regression/random_forest_regressor.py
+_shared = {}
+
+def _init_tree_worker(data_dir):
+    """Pool initializer: memory-map the training matrix written once by fit()."""
+    _shared['X'] = np.load(os.path.join(data_dir, 'X.npy'), mmap_mode='r')
+    _shared['y'] = np.load(os.path.join(data_dir, 'y.npy'), mmap_mode='r')
+
+def _fit_tree(tree_params, seed, X, y):
+    # the bootstrap sample is drawn from this tree's own seed, so the tree does
+    # not depend on which process builds it or in what order
+    n_samples = X.shape[0]
+    indices = np.random.default_rng(seed).integers(0, n_samples, n_samples)
+    return DecisionTreeRegressorCustom(**tree_params).fit(X, y, sample_indices=indices)
+
+def _fit_tree_worker(task):
+    tree_params, seed = task
+    return _fit_tree(tree_params, seed, _shared['X'], _shared['y'])
+
 class RandomForestRegressorCustom(BaseEstimator):
     """
     Random Forest Regressor
+    
+    Each tree draws its bootstrap sample from its own SeedSequence spawned
+    from random_state, so a fixed random_state gives the same forest for any
+    n_jobs. With n_jobs > 1 (or -1 for all cores) trees are built in a process
+    pool that memory-maps X and y instead of receiving a pickled copy per tree.
     """
-    def __init__(self, n_estimators=100, max_depth=10, min_samples_split=2):
+    def __init__(self, n_estimators=100, max_depth=10, min_samples_split=2, min_samples_leaf=1,
+                 n_jobs=None, random_state=None):
         self.n_estimators = n_estimators
         self.max_depth = max_depth
         self.min_samples_split = min_samples_split
+        self.min_samples_leaf = min_samples_leaf
+        self.n_jobs = n_jobs
+        self.random_state = random_state
         self.trees = []
-        
-    def bootstrap_sample(self, X, y):
-        n_samples = X.shape[0]
-        indices = np.random.choice(n_samples, n_samples, replace=True)
-        return X[indices], y[indices]
     
     def fit(self, X, y):
-        self.trees = []
+        X, y = np.asarray(X), np.asarray(y)
+        tree_params = {
+            'max_depth': self.max_depth,
+            'min_samples_split': self.min_samples_split,
+            'min_samples_leaf': self.min_samples_leaf,
+        }
+        seeds = np.random.SeedSequence(self.random_state).spawn(self.n_estimators)
+        
+        n_jobs = os.cpu_count() if self.n_jobs == -1 else (self.n_jobs or 1)
+        n_jobs = min(n_jobs, self.n_estimators)
+        if n_jobs <= 1:
+            self.trees = [_fit_tree(tree_params, seed, X, y) for seed in seeds]
+            return self
         
-        for _ in range(self.n_estimators):
-            tree = DecisionTreeRegressorCustom(
-                max_depth=self.max_depth,
-                min_samples_split=self.min_samples_split
-            )
-            X_sample, y_sample = self.bootstrap_sample(X, y)
-            tree.fit(X_sample, y_sample)
-            self.trees.append(tree)
+        with tempfile.TemporaryDirectory(prefix='mlops_forest_') as data_dir:
+            np.save(os.path.join(data_dir, 'X.npy'), X)
+            np.save(os.path.join(data_dir, 'y.npy'), y)
+            with multiprocessing.get_context().Pool(n_jobs, initializer=_init_tree_worker, initargs=(data_dir,)) as pool:
+                # map keeps the seed order, so trees come back in the same order for any n_jobs
+                self.trees = pool.map(_fit_tree_worker, [(tree_params, seed) for seed in seeds])
         
         return self
     
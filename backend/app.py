@@ -1,25 +1,54 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
+import click
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.ensemble import BaseEnsemble
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     mean_squared_error, mean_absolute_error, r2_score
 )
+import atexit
+import base64
+import bisect
+import csv
+import gzip
+import hashlib
 import io
 import json
+import multiprocessing
 import os
+import shutil
+import tempfile
 import joblib
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import threading
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 import mysql.connector
 from mysql.connector import Error as MySQLError
-from collections import defaultdict
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+from collections import defaultdict, OrderedDict
+from multiprocessing import connection as mp_connection
 import psutil
 
+try:
+    import zstandard
+except ImportError:  # optional: only needed for zstd-compressed uploads
+    zstandard = None
+
+try:
+    import resource
+except ImportError:  # not on Windows: worker peak memory is then not reported
+    resource = None
+
 # Classification algorithms
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
@@ -40,24 +69,157 @@ CORS(app)
 
 # ---- MySQL helpers ----
 
+DB_POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE", "5"))
+DB_POOL_HEALTHCHECK = os.environ.get("MYSQL_POOL_HEALTHCHECK", "1") != "0"
+
+_db_pool = None
+_db_lock = threading.Lock()
+_schema_ready = False
+# After a failed bootstrap, connections retry it at most this often
+SCHEMA_RETRY_S = float(os.environ.get("MYSQL_SCHEMA_RETRY_S", "30"))
+_schema_retry_at = 0.0
+db_pool_stats = defaultdict(int)
+_db_stats_lock = threading.Lock()
+
+def count_pool_event(key: str):
+    with _db_stats_lock:
+        db_pool_stats[key] += 1
+
+def get_db_config() -> Dict[str, Any]:
+    return {
+        'host': os.environ.get("MYSQL_HOST", "localhost"),
+        'port': int(os.environ.get("MYSQL_PORT", "3306")),
+        'user': os.environ.get("MYSQL_USER", "root"),
+        'password': os.environ.get("MYSQL_PASSWORD", ""),
+        'database': os.environ.get("MYSQL_DB", "mlops"),
+        'autocommit': True,
+    }
+
+def get_db_pool():
+    """Create the shared connection pool on first use."""
+    global _db_pool
+    if _db_pool is None:
+        with _db_lock:
+            if _db_pool is None:
+                _db_pool = pooling.MySQLConnectionPool(
+                    pool_name="mlops",
+                    pool_size=DB_POOL_SIZE,
+                    pool_reset_session=True,
+                    **get_db_config(),
+                )
+    return _db_pool
+
 def get_db_connection():
-    """Create a MySQL connection using environment variables. Returns None on failure."""
+    """Borrow a MySQL connection from the pool. Returns None on failure.
+
+    Calling close() on the connection hands it back to the pool. When the pool is
+    exhausted a plain (unpooled) connection is opened instead of failing the request.
+    """
+    conn = None
     try:
-        conn = mysql.connector.connect(
-            host=os.environ.get("MYSQL_HOST", "localhost"),
-            port=int(os.environ.get("MYSQL_PORT", "3306")),
-            user=os.environ.get("MYSQL_USER", "root"),
-            password=os.environ.get("MYSQL_PASSWORD", ""),
-            database=os.environ.get("MYSQL_DB", "mlops"),
-            autocommit=True,
-        )
-        return conn
+        try:
+            conn = get_db_pool().get_connection()
+            count_pool_event('borrowed')
+        except PoolError:
+            conn = mysql.connector.connect(**get_db_config())
+            count_pool_event('overflow')
+        if DB_POOL_HEALTHCHECK:
+            # Transparently replace connections dropped by the server (wait_timeout, restarts)
+            conn.ping(reconnect=True, attempts=1, delay=0)
     except MySQLError as e:
+        count_pool_event('failed')
         print("MySQL connection failed:", str(e))
+        if conn is not None:
+            try:
+                conn.close()
+            except MySQLError:
+                pass
         return None
+    if not _schema_ready and time.monotonic() >= _schema_retry_at:
+        bootstrap_schema(conn)
+    return conn
+
+def bootstrap_schema(conn=None):
+    """Create/migrate tables once per process so request paths never run DDL.
+
+    Only marks the schema ready when every step succeeded; after a failure
+    (e.g. a transient DDL error at startup) it is retried by a later connection,
+    at most every SCHEMA_RETRY_S seconds.
+    """
+    global _schema_ready, _schema_retry_at
+    if _schema_ready:
+        return
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+        if conn is None:
+            return
+    try:
+        with _db_lock:
+            if not _schema_ready:
+                ok = ensure_models_table(conn)
+                ok = ensure_api_usage_table(conn) and ok
+                created = ensure_api_usage_totals_table(conn)
+                if created:
+                    backfill_usage_totals(conn)
+                ok = created is not None and ok
+                created = ensure_api_usage_rollups_table(conn)
+                if created:
+                    backfill_usage_rollups(conn)
+                ok = created is not None and ok
+                ok = ensure_maintenance_runs_table(conn) and ok
+                ok = ensure_training_jobs_table(conn) and ok
+                if ok:
+                    _schema_ready = True
+                else:
+                    _schema_retry_at = time.monotonic() + SCHEMA_RETRY_S
+                    print(f"MySQL schema bootstrap incomplete, retrying in {SCHEMA_RETRY_S:.0f}s")
+    finally:
+        if own_conn:
+            conn.close()
+    start_usage_maintenance()
+
+def table_columns(conn, table: str) -> List[str]:
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+    )
+    columns = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return columns
+
+def ensure_column(conn, table: str, column: str, definition: str) -> bool:
+    """Add a column to an existing table if an older schema lacks it. Returns False on failure."""
+    try:
+        if column not in table_columns(conn, table):
+            cursor = conn.cursor()
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            cursor.close()
+        return True
+    except MySQLError as e:
+        print(f"MySQL migration of {table}.{column} failed:", str(e))
+        return False
+
+def ensure_index(conn, table: str, index: str, columns: str) -> bool:
+    """Add an index to an existing table if an older schema lacks it. Returns False on failure."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+            (table, index),
+        )
+        exists = cursor.fetchone() is not None
+        if not exists:
+            cursor.execute(f"ALTER TABLE {table} ADD INDEX {index} ({columns})")
+        cursor.close()
+        return True
+    except MySQLError as e:
+        print(f"MySQL index {table}.{index} creation failed:", str(e))
+        return False
 
-def ensure_models_table(conn):
-    """Create models table if it does not exist."""
+def ensure_models_table(conn) -> bool:
+    """Create models table if it does not exist. Returns False if any step failed."""
     try:
         cursor = conn.cursor()
         cursor.execute(
@@ -82,17 +244,15 @@ def ensure_models_table(conn):
         cursor.close()
     except MySQLError as e:
         print("MySQL table creation failed:", str(e))
+        return False
 
-    # Best-effort add metrics_json if table already existed without it
-    try:
-        cursor = conn.cursor()
-        cursor.execute("ALTER TABLE models ADD COLUMN metrics_json TEXT")
-        cursor.close()
-    except MySQLError:
-        pass  # column already exists or alter not needed
+    # Add metrics_json if table already existed without it
+    ok = ensure_column(conn, 'models', 'metrics_json', 'TEXT')
+    # Keyset pagination of the listing
+    return ensure_index(conn, 'models', 'idx_created_id', 'created_at, id') and ok
 
-def ensure_api_usage_table(conn):
-    """Create api_usage_events table if it does not exist."""
+def ensure_api_usage_table(conn) -> bool:
+    """Create api_usage_events table if it does not exist. Returns False if any step failed."""
     try:
         cursor = conn.cursor()
         cursor.execute(
@@ -106,6 +266,7 @@ def ensure_api_usage_table(conn):
                 latency_ms FLOAT,
                 cpu_percent FLOAT,
                 ram_mb FLOAT,
+                row_count INT DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 INDEX idx_model_id (model_id),
                 INDEX idx_created_at (created_at)
@@ -115,6 +276,608 @@ def ensure_api_usage_table(conn):
         cursor.close()
     except MySQLError as e:
         print("MySQL api_usage_events table creation failed:", str(e))
+        return False
+
+    # Add row_count if table already existed without it
+    ok = ensure_column(conn, 'api_usage_events', 'row_count', 'INT DEFAULT 1')
+    # Serves "latest events of a model" without sorting the model's whole history
+    return ensure_index(conn, 'api_usage_events', 'idx_model_created', 'model_id, created_at') and ok
+
+# ---- Usage aggregates ----
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket holds everything above.
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+LATENCY_BUCKET_COLUMNS = [f"lat_bucket_{i}" for i in range(len(LATENCY_BUCKETS_MS) + 1)]
+USAGE_COUNTER_COLUMNS = [
+    'total_events', 'success_events', 'total_copies', 'total_predictions', 'success_predictions',
+    'rows_predicted', 'latency_count', 'latency_sum',
+] + LATENCY_BUCKET_COLUMNS
+
+def latency_bucket_sums_sql() -> List[str]:
+    """SUM(...) expressions counting api_usage_events rows per latency bucket."""
+    exprs = []
+    lower = None
+    for upper in LATENCY_BUCKETS_MS + [None]:
+        conds = ["latency_ms IS NOT NULL"]
+        if lower is not None:
+            conds.append(f"latency_ms > {lower}")
+        if upper is not None:
+            conds.append(f"latency_ms <= {upper}")
+        exprs.append(f"SUM({' AND '.join(conds)})")
+        lower = upper
+    return exprs
+
+def estimate_latency_percentile(
+    counts: List[int], q: float, min_ms: Optional[float] = None, max_ms: Optional[float] = None
+) -> Optional[float]:
+    """Estimate a latency quantile from histogram bucket counts by linear interpolation."""
+    total = sum(counts)
+    if not total:
+        return None
+    target = q * total
+    cumulative = 0
+    for i, count in enumerate(counts):
+        if count and cumulative + count >= target:
+            lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else (min_ms if min_ms is not None else 0.0)
+            upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else (max_ms if max_ms is not None else lower)
+            if min_ms is not None:
+                lower = max(lower, min_ms)
+            if max_ms is not None:
+                upper = min(upper, max_ms)
+            value = lower + (upper - lower) * (target - cumulative) / count
+            return round(float(value), 2)
+        cumulative += count
+    return max_ms
+
+def ensure_api_usage_totals_table(conn) -> Optional[bool]:
+    """Create the per-model usage counters table. Returns True if it was just created,
+    False if it already existed, None on failure."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SHOW TABLES LIKE 'api_usage_totals'")
+        existed = cursor.fetchone() is not None
+        bucket_ddl = "".join(f"{col} BIGINT DEFAULT 0,\n" for col in LATENCY_BUCKET_COLUMNS)
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS api_usage_totals (
+                model_id INT PRIMARY KEY,
+                total_events BIGINT DEFAULT 0,
+                success_events BIGINT DEFAULT 0,
+                total_copies BIGINT DEFAULT 0,
+                total_predictions BIGINT DEFAULT 0,
+                success_predictions BIGINT DEFAULT 0,
+                rows_predicted BIGINT DEFAULT 0,
+                latency_count BIGINT DEFAULT 0,
+                latency_sum DOUBLE DEFAULT 0,
+                {bucket_ddl}
+                last_used_at TIMESTAMP NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            );
+            """
+        )
+        cursor.close()
+        return not existed
+    except MySQLError as e:
+        print("MySQL api_usage_totals table creation failed:", str(e))
+        return None
+
+def backfill_usage_totals(conn):
+    """Seed api_usage_totals from the raw event history (runs once, when the table is created)."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            INSERT INTO api_usage_totals (model_id, {', '.join(USAGE_COUNTER_COLUMNS)}, last_used_at)
+            SELECT
+                model_id,
+                COUNT(*),
+                SUM(success),
+                SUM(event_type = 'copy'),
+                SUM(event_type = 'predict'),
+                SUM(event_type = 'predict' AND success),
+                SUM(CASE WHEN event_type = 'predict' AND success THEN COALESCE(row_count, 1) ELSE 0 END),
+                COUNT(latency_ms),
+                COALESCE(SUM(latency_ms), 0),
+                {', '.join(latency_bucket_sums_sql())},
+                MAX(created_at)
+            FROM api_usage_events
+            WHERE model_id IS NOT NULL
+            GROUP BY model_id
+            """
+        )
+        cursor.close()
+    except MySQLError as e:
+        print("MySQL api_usage_totals backfill failed:", str(e))
+
+def empty_usage_totals() -> Dict[str, Any]:
+    totals: Dict[str, Any] = {col: 0 for col in USAGE_COUNTER_COLUMNS}
+    totals['latency_sum'] = 0.0
+    totals['last_used_at'] = None
+    return totals
+
+def merge_usage_totals(into: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    for col in USAGE_COUNTER_COLUMNS:
+        into[col] += other.get(col) or 0
+    if other.get('last_used_at') is not None and (
+        into['last_used_at'] is None or other['last_used_at'] > into['last_used_at']
+    ):
+        into['last_used_at'] = other['last_used_at']
+    return into
+
+def load_usage_totals(model_ids: List[int]) -> Optional[Dict[int, Dict[str, Any]]]:
+    """Read persisted counters for the given models. Returns None on DB issues."""
+    if not model_ids:
+        return {}
+    conn = get_db_connection()
+    if conn is None:
+        return None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            f"SELECT model_id, {', '.join(USAGE_COUNTER_COLUMNS)}, last_used_at FROM api_usage_totals "
+            f"WHERE model_id IN ({', '.join(['%s'] * len(model_ids))})",
+            list(model_ids),
+        )
+        rows = cursor.fetchall() or []
+        cursor.close()
+    except MySQLError as e:
+        print("MySQL load usage totals failed:", str(e))
+        return None
+    finally:
+        conn.close()
+    loaded = {}
+    for row in rows:
+        totals = empty_usage_totals()
+        for col in USAGE_COUNTER_COLUMNS:
+            totals[col] = float(row[col] or 0) if col == 'latency_sum' else int(row[col] or 0)
+        totals['last_used_at'] = row.get('last_used_at')
+        loaded[row['model_id']] = totals
+    return loaded
+
+def write_usage_totals(deltas: Dict[int, Dict[str, Any]]) -> bool:
+    """Add counter deltas to api_usage_totals with a single upsert. Returns False on DB issues."""
+    if not deltas:
+        return True
+    conn = get_db_connection()
+    if conn is None:
+        return False
+    try:
+        columns = ['model_id'] + USAGE_COUNTER_COLUMNS + ['last_used_at']
+        placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        params: List[Any] = []
+        for model_id, delta in deltas.items():
+            params.append(model_id)
+            params.extend(delta[col] for col in USAGE_COUNTER_COLUMNS)
+            params.append(delta['last_used_at'])
+        updates = [f"{col} = {col} + VALUES({col})" for col in USAGE_COUNTER_COLUMNS]
+        updates.append("last_used_at = GREATEST(COALESCE(last_used_at, VALUES(last_used_at)), VALUES(last_used_at))")
+        cursor = conn.cursor()
+        cursor.execute(
+            f"INSERT INTO api_usage_totals ({', '.join(columns)}) VALUES "
+            + ", ".join([placeholders] * len(deltas))
+            + " ON DUPLICATE KEY UPDATE " + ", ".join(updates),
+            params,
+        )
+        conn.commit()
+        cursor.close()
+        return True
+    except MySQLError as e:
+        print("MySQL write usage totals failed:", str(e))
+        return False
+    finally:
+        conn.close()
+
+class UsageAggregates:
+    """Per-model usage counters kept in memory and periodically persisted.
+
+    The view of a model is its persisted base (read once, refreshed on every
+    persist so other workers' increments show up) plus the local deltas not yet
+    written. Reading a summary therefore never scans api_usage_events.
+    """
+    def __init__(self, persist_interval: float):
+        self.persist_interval = persist_interval
+        self._lock = threading.Lock()
+        self._base: Dict[int, Dict[str, Any]] = {}
+        self._delta: Dict[int, Dict[str, Any]] = {}
+        self._last_persist = time.monotonic()
+
+    def record(self, event: Dict[str, Any]):
+        model_id = event.get('model_id')
+        if model_id is None:
+            return
+        is_predict = event.get('event_type') == 'predict'
+        success = bool(event.get('success'))
+        latency = event.get('latency_ms')
+        with self._lock:
+            delta = self._delta.get(model_id)
+            if delta is None:
+                delta = self._delta[model_id] = empty_usage_totals()
+            delta['total_events'] += 1
+            delta['success_events'] += int(success)
+            delta['total_copies'] += int(event.get('event_type') == 'copy')
+            delta['total_predictions'] += int(is_predict)
+            if is_predict and success:
+                delta['success_predictions'] += 1
+                delta['rows_predicted'] += int(event.get('row_count') or 1)
+            if latency is not None:
+                delta['latency_count'] += 1
+                delta['latency_sum'] += float(latency)
+                delta[LATENCY_BUCKET_COLUMNS[bisect.bisect_left(LATENCY_BUCKETS_MS, latency)]] += 1
+            created_at = event.get('created_at')
+            if created_at is not None and (delta['last_used_at'] is None or created_at > delta['last_used_at']):
+                delta['last_used_at'] = created_at
+
+    def totals(self, model_id: int) -> Dict[str, Any]:
+        with self._lock:
+            loaded = model_id in self._base
+        if not loaded:
+            persisted = load_usage_totals([model_id])
+            # Leave the base unset when the DB is unreachable so the next read retries
+            if persisted is not None:
+                with self._lock:
+                    self._base.setdefault(model_id, persisted.get(model_id) or empty_usage_totals())
+        with self._lock:
+            totals = merge_usage_totals(empty_usage_totals(), self._base.get(model_id) or {})
+            return merge_usage_totals(totals, self._delta.get(model_id) or {})
+
+    def summary(self, model_id: int) -> Dict[str, Any]:
+        t = self.totals(model_id)
+        last_used = t['last_used_at']
+        return {
+            'total_predictions': t['total_predictions'],
+            'total_copies': t['total_copies'],
+            'success_predictions': t['success_predictions'],
+            'failed_predictions': max(t['total_predictions'] - t['success_predictions'], 0),
+            'total_rows_predicted': t['rows_predicted'],
+            'success_rate': round(t['success_events'] / t['total_events'], 4) if t['total_events'] else None,
+            'avg_latency_ms': round(t['latency_sum'] / t['latency_count'], 2) if t['latency_count'] else None,
+            'last_used_at': last_used.isoformat() if hasattr(last_used, 'isoformat') else last_used,
+            'latency_histogram': [
+                {'le_ms': bound, 'count': t[col]}
+                for bound, col in zip(LATENCY_BUCKETS_MS + [None], LATENCY_BUCKET_COLUMNS)
+            ],
+        }
+
+    def forget(self, model_id: int):
+        with self._lock:
+            self._base.pop(model_id, None)
+            self._delta.pop(model_id, None)
+
+    def persist(self):
+        """Write pending deltas, then refresh the cached bases from the DB."""
+        with self._lock:
+            deltas, self._delta = self._delta, {}
+            self._last_persist = time.monotonic()
+        if not write_usage_totals(deltas):
+            with self._lock:
+                for model_id, delta in deltas.items():
+                    pending = self._delta.get(model_id)
+                    self._delta[model_id] = merge_usage_totals(delta, pending) if pending else delta
+            return
+        with self._lock:
+            for model_id, delta in deltas.items():
+                if model_id in self._base:
+                    merge_usage_totals(self._base[model_id], delta)
+            cached_ids = list(self._base)
+        refreshed = load_usage_totals(cached_ids)
+        if refreshed:
+            with self._lock:
+                for model_id, base in refreshed.items():
+                    if model_id in self._base:
+                        self._base[model_id] = base
+
+    def maybe_persist(self):
+        if time.monotonic() - self._last_persist >= self.persist_interval:
+            self.persist()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'cached_models': len(self._base), 'models_with_pending_deltas': len(self._delta)}
+
+usage_aggregates = UsageAggregates(
+    persist_interval=float(os.environ.get("USAGE_TOTALS_PERSIST_INTERVAL_S", "10")),
+)
+
+# ---- Usage rollups ----
+
+ROLLUP_SUM_COLUMNS = [
+    'total_events', 'success_events', 'total_copies', 'total_predictions', 'success_predictions',
+    'rows_predicted', 'latency_count', 'latency_sum', 'cpu_count', 'cpu_sum', 'ram_count', 'ram_sum',
+] + LATENCY_BUCKET_COLUMNS
+
+def ensure_api_usage_rollups_table(conn) -> Optional[bool]:
+    """Create the hourly per-model rollup table. Returns True if it was just created,
+    False if it already existed, None on failure."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SHOW TABLES LIKE 'api_usage_rollups'")
+        existed = cursor.fetchone() is not None
+        bucket_ddl = "".join(f"{col} BIGINT DEFAULT 0,\n" for col in LATENCY_BUCKET_COLUMNS)
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS api_usage_rollups (
+                model_id INT NOT NULL,
+                bucket_start DATETIME NOT NULL,
+                total_events BIGINT DEFAULT 0,
+                success_events BIGINT DEFAULT 0,
+                total_copies BIGINT DEFAULT 0,
+                total_predictions BIGINT DEFAULT 0,
+                success_predictions BIGINT DEFAULT 0,
+                rows_predicted BIGINT DEFAULT 0,
+                latency_count BIGINT DEFAULT 0,
+                latency_sum DOUBLE DEFAULT 0,
+                latency_min FLOAT NULL,
+                latency_max FLOAT NULL,
+                cpu_count BIGINT DEFAULT 0,
+                cpu_sum DOUBLE DEFAULT 0,
+                ram_count BIGINT DEFAULT 0,
+                ram_sum DOUBLE DEFAULT 0,
+                {bucket_ddl}
+                PRIMARY KEY (model_id, bucket_start)
+            );
+            """
+        )
+        cursor.close()
+        return not existed
+    except MySQLError as e:
+        print("MySQL api_usage_rollups table creation failed:", str(e))
+        return None
+
+def backfill_usage_rollups(conn):
+    """Seed api_usage_rollups from the raw event history (runs once, when the table is created)."""
+    hour_expr = "DATE_FORMAT(created_at, '%Y-%m-%d %H:00:00')"
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            INSERT INTO api_usage_rollups
+                (model_id, bucket_start, {', '.join(ROLLUP_SUM_COLUMNS)}, latency_min, latency_max)
+            SELECT
+                model_id,
+                {hour_expr},
+                COUNT(*),
+                SUM(success),
+                SUM(event_type = 'copy'),
+                SUM(event_type = 'predict'),
+                SUM(event_type = 'predict' AND success),
+                SUM(CASE WHEN event_type = 'predict' AND success THEN COALESCE(row_count, 1) ELSE 0 END),
+                COUNT(latency_ms),
+                COALESCE(SUM(latency_ms), 0),
+                COUNT(cpu_percent),
+                COALESCE(SUM(cpu_percent), 0),
+                COUNT(ram_mb),
+                COALESCE(SUM(ram_mb), 0),
+                {', '.join(latency_bucket_sums_sql())},
+                MIN(latency_ms),
+                MAX(latency_ms)
+            FROM api_usage_events
+            WHERE model_id IS NOT NULL
+            GROUP BY model_id, {hour_expr}
+            """
+        )
+        cursor.close()
+    except MySQLError as e:
+        print("MySQL api_usage_rollups backfill failed:", str(e))
+
+def rollup_events(events: List[Dict[str, Any]]) -> Dict[tuple, Dict[str, Any]]:
+    """Fold raw events into per (model_id, hour) rollup deltas."""
+    rollups: Dict[tuple, Dict[str, Any]] = {}
+    for event in events:
+        model_id = event.get('model_id')
+        created_at = event.get('created_at')
+        if model_id is None or created_at is None:
+            continue
+        key = (model_id, created_at.replace(minute=0, second=0, microsecond=0))
+        r = rollups.get(key)
+        if r is None:
+            r = rollups[key] = {col: 0 for col in ROLLUP_SUM_COLUMNS}
+            r['latency_min'] = None
+            r['latency_max'] = None
+        is_predict = event.get('event_type') == 'predict'
+        success = bool(event.get('success'))
+        r['total_events'] += 1
+        r['success_events'] += int(success)
+        r['total_copies'] += int(event.get('event_type') == 'copy')
+        r['total_predictions'] += int(is_predict)
+        if is_predict and success:
+            r['success_predictions'] += 1
+            r['rows_predicted'] += int(event.get('row_count') or 1)
+        latency = event.get('latency_ms')
+        if latency is not None:
+            r['latency_count'] += 1
+            r['latency_sum'] += float(latency)
+            r[LATENCY_BUCKET_COLUMNS[bisect.bisect_left(LATENCY_BUCKETS_MS, latency)]] += 1
+            r['latency_min'] = latency if r['latency_min'] is None else min(r['latency_min'], latency)
+            r['latency_max'] = latency if r['latency_max'] is None else max(r['latency_max'], latency)
+        for prefix, field in (('cpu', 'cpu_percent'), ('ram', 'ram_mb')):
+            if event.get(field) is not None:
+                r[f'{prefix}_count'] += 1
+                r[f'{prefix}_sum'] += float(event[field])
+    return rollups
+
+def upsert_usage_rollups(cursor, rollups: Dict[tuple, Dict[str, Any]]):
+    if not rollups:
+        return
+    columns = ['model_id', 'bucket_start'] + ROLLUP_SUM_COLUMNS + ['latency_min', 'latency_max']
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    params: List[Any] = []
+    for (model_id, bucket_start), r in rollups.items():
+        params.extend([model_id, bucket_start])
+        params.extend(r[col] for col in ROLLUP_SUM_COLUMNS)
+        params.extend([r['latency_min'], r['latency_max']])
+    updates = [f"{col} = {col} + VALUES({col})" for col in ROLLUP_SUM_COLUMNS]
+    updates.append("latency_min = LEAST(COALESCE(latency_min, VALUES(latency_min)), COALESCE(VALUES(latency_min), latency_min))")
+    updates.append("latency_max = GREATEST(COALESCE(latency_max, VALUES(latency_max)), COALESCE(VALUES(latency_max), latency_max))")
+    cursor.execute(
+        f"INSERT INTO api_usage_rollups ({', '.join(columns)}) VALUES "
+        + ", ".join([placeholders] * len(rollups))
+        + " ON DUPLICATE KEY UPDATE " + ", ".join(updates),
+        params,
+    )
+
+API_EVENT_COLUMNS = (
+    'model_id', 'model_file', 'event_type', 'success', 'latency_ms', 'cpu_percent', 'ram_mb', 'row_count', 'created_at',
+)
+
+def write_api_events(events: List[Dict[str, Any]]) -> bool:
+    """Persist usage events with a single multi-row INSERT and fold them into the hourly
+    rollups in the same transaction. Returns False on DB issues."""
+    if not events:
+        return True
+    conn = get_db_connection()
+    if conn is None:
+        return False
+    try:
+        placeholders = "(" + ", ".join(["%s"] * len(API_EVENT_COLUMNS)) + ")"
+        params: List[Any] = []
+        for event in events:
+            params.extend(event.get(col) for col in API_EVENT_COLUMNS)
+        conn.start_transaction()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"INSERT INTO api_usage_events ({', '.join(API_EVENT_COLUMNS)}) VALUES "
+            + ", ".join([placeholders] * len(events)),
+            params,
+        )
+        upsert_usage_rollups(cursor, rollup_events(events))
+        conn.commit()
+        cursor.close()
+        return True
+    except MySQLError as e:
+        print("MySQL log api events failed:", str(e))
+        try:
+            conn.rollback()
+        except MySQLError:
+            pass
+        return False
+    finally:
+        conn.close()
+
+class UsageEventWriter:
+    """Background writer that buffers usage events and flushes them in batches.
+
+    A flush happens when batch_size events are pending or flush_interval seconds
+    have passed since the last one. The buffer is bounded: events arriving while
+    it is full are dropped and counted rather than blocking the request. Events of
+    models passed to forget() are discarded instead of written.
+    """
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int, aggregates: Optional[UsageAggregates] = None):
+        self.aggregates = aggregates
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._pending: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+        # held while a batch is written, so forget() can wait for one already taken
+        self._write_lock = threading.Lock()
+        self._forgotten: set = set()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='usage-event-writer', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        with self._cond:
+            if len(self._pending) >= self.max_queue:
+                self.dropped += 1
+                return False
+            self._pending.append(event)
+            self.enqueued += 1
+            self._ensure_started()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = self._pending[:self.batch_size]
+        del self._pending[:self.batch_size]
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        with self._write_lock:
+            with self._cond:
+                batch = [e for e in batch if e.get('model_id') not in self._forgotten]
+            ok = write_api_events(batch)
+        with self._cond:
+            self.flushes += 1
+            if ok:
+                self.written += len(batch)
+            else:
+                self.failed += len(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping and not self._pending:
+                    return
+                batch = self._take_batch()
+            if batch:
+                self._write(batch)
+            if self.aggregates is not None:
+                self.aggregates.maybe_persist()
+
+    def forget(self, model_id: int):
+        """Discard the buffered and future events of a deleted model.
+
+        Also waits for a batch being written, so its rows are in the DB before the
+        caller deletes the model's usage.
+        """
+        with self._cond:
+            self._forgotten.add(model_id)
+            self._pending = [e for e in self._pending if e.get('model_id') != model_id]
+        with self._write_lock:
+            pass
+
+    def flush(self):
+        """Synchronously write everything currently buffered."""
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop the background thread after draining the buffer."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+        if self.aggregates is not None:
+            self.aggregates.persist()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'max_queue': self.max_queue,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'flushes': self.flushes,
+            }
+
+usage_writer = UsageEventWriter(
+    batch_size=int(os.environ.get("USAGE_LOG_BATCH_SIZE", "200")),
+    flush_interval=float(os.environ.get("USAGE_LOG_FLUSH_INTERVAL_S", "1.0")),
+    max_queue=int(os.environ.get("USAGE_LOG_MAX_QUEUE", "10000")),
+    aggregates=usage_aggregates,
+)
+atexit.register(usage_writer.shutdown)
 
 def log_api_event(
     model_id: Optional[int],
@@ -124,88 +887,256 @@ def log_api_event(
     latency_ms: Optional[float] = None,
     cpu_percent: Optional[float] = None,
     ram_mb: Optional[float] = None,
+    row_count: int = 1,
 ):
-    """Persist an API usage event. Best-effort: return silently on DB issues."""
-    conn = get_db_connection()
-    if conn is None:
-        return
-    ensure_api_usage_table(conn)
+    """Queue an API usage event for the background writer. Best-effort: never raises on DB issues.
+
+    Batch predictions are logged as a single event whose row_count is the batch size.
+    The in-memory usage aggregates are updated immediately.
+    """
+    event = {
+        'model_id': model_id,
+        'model_file': model_file,
+        'event_type': event_type,
+        'success': success,
+        'latency_ms': latency_ms,
+        'cpu_percent': cpu_percent,
+        'ram_mb': ram_mb,
+        'row_count': row_count,
+        # timestamp at call time, not at flush time
+        'created_at': datetime.now(),
+    }
+    usage_aggregates.record(event)
+    usage_writer.enqueue(event)
+
+# ---- Usage retention ----
+
+USAGE_RETENTION_DAYS = int(os.environ.get("USAGE_RETENTION_DAYS", "90"))
+USAGE_DELETE_CHUNK_SIZE = int(os.environ.get("USAGE_DELETE_CHUNK_SIZE", "5000"))
+# Seconds between background compaction runs; 0 disables the background task
+USAGE_COMPACTION_INTERVAL_S = float(os.environ.get("USAGE_COMPACTION_INTERVAL_S", "3600"))
+
+_maintenance_thread: Optional[threading.Thread] = None
+last_compaction: Dict[str, Any] = {}
+
+def ensure_maintenance_runs_table(conn) -> bool:
+    """Create maintenance_runs table (timing/outcome of each compaction run). Returns False on failure."""
     try:
         cursor = conn.cursor()
         cursor.execute(
             """
-            INSERT INTO api_usage_events (model_id, model_file, event_type, success, latency_ms, cpu_percent, ram_mb)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                model_id,
-                model_file,
-                event_type,
-                success,
-                latency_ms,
-                cpu_percent,
-                ram_mb,
-            ),
+            CREATE TABLE IF NOT EXISTS maintenance_runs (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                task VARCHAR(64) NOT NULL,
+                started_at TIMESTAMP NULL,
+                duration_ms FLOAT,
+                rows_deleted BIGINT DEFAULT 0,
+                cutoff DATETIME NULL,
+                success BOOLEAN DEFAULT TRUE,
+                error TEXT,
+                INDEX idx_task_started (task, started_at)
+            );
+            """
         )
-        conn.commit()
         cursor.close()
+        return True
     except MySQLError as e:
-        print("MySQL log api event failed:", str(e))
+        print("MySQL maintenance_runs table creation failed:", str(e))
+        return False
+
+def delete_in_chunks(conn, table: str, where_sql: str, params: tuple, chunk_size: int = 0) -> int:
+    """DELETE matching rows in bounded chunks so long deletes never hold large locks.
+
+    The connection is in autocommit mode, so each chunk commits on its own.
+    """
+    chunk_size = chunk_size or USAGE_DELETE_CHUNK_SIZE
+    deleted = 0
+    cursor = conn.cursor()
+    try:
+        while True:
+            cursor.execute(f"DELETE FROM {table} WHERE {where_sql} LIMIT {int(chunk_size)}", params)
+            deleted += cursor.rowcount
+            if cursor.rowcount < chunk_size:
+                return deleted
     finally:
-        conn.close()
+        cursor.close()
+
+def compact_usage_events(retention_days: Optional[int] = None) -> Dict[str, Any]:
+    """Drop raw api_usage_events older than the retention window.
+
+    Events are folded into api_usage_rollups/api_usage_totals when they are written
+    (and backfilled when those tables are created), so old raw rows only need to
+    be deleted. Each run is timed and recorded in maintenance_runs.
+    """
+    retention_days = USAGE_RETENTION_DAYS if retention_days is None else retention_days
+    started_at = datetime.now()
+    cutoff = started_at - timedelta(days=retention_days)
+    start = time.perf_counter()
+    run = {'task': 'compact_usage_events', 'started_at': started_at, 'cutoff': cutoff,
+           'rows_deleted': 0, 'success': False, 'error': None, 'skipped': False}
+    conn = get_db_connection()
+    if conn is None:
+        run['error'] = 'DB connection unavailable'
+        run['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return run
+    try:
+        cursor = conn.cursor()
+        # Only one worker/process compacts at a time
+        cursor.execute("SELECT GET_LOCK('mlops_usage_compaction', 0)")
+        locked = (cursor.fetchone() or [0])[0] == 1
+        cursor.close()
+        if not locked:
+            run['skipped'] = True
+            run['success'] = True
+        else:
+            try:
+                run['rows_deleted'] = delete_in_chunks(conn, 'api_usage_events', 'created_at < %s', (cutoff,))
+                run['success'] = True
+            finally:
+                cursor = conn.cursor()
+                cursor.execute("SELECT RELEASE_LOCK('mlops_usage_compaction')")
+                cursor.fetchall()
+                cursor.close()
+    except MySQLError as e:
+        run['error'] = str(e)
+        print("MySQL usage compaction failed:", str(e))
+    run['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    if not run['skipped']:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO maintenance_runs (task, started_at, duration_ms, rows_deleted, cutoff, success, error)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                (run['task'], started_at, run['duration_ms'], run['rows_deleted'], cutoff, run['success'], run['error']),
+            )
+            cursor.close()
+        except MySQLError as e:
+            print("MySQL record maintenance run failed:", str(e))
+    conn.close()
+    last_compaction.clear()
+    last_compaction.update({
+        **run,
+        'started_at': started_at.isoformat(),
+        'cutoff': cutoff.isoformat(),
+    })
+    return run
+
+def _usage_maintenance_loop():
+    while True:
+        time.sleep(USAGE_COMPACTION_INTERVAL_S)
+        try:
+            compact_usage_events()
+        except Exception as e:
+            print("usage compaction failed:", str(e))
+
+def start_usage_maintenance():
+    """Start the periodic compaction thread once per process (if enabled)."""
+    global _maintenance_thread
+    if USAGE_COMPACTION_INTERVAL_S <= 0 or _maintenance_thread is not None:
+        return
+    with _db_lock:
+        if _maintenance_thread is None:
+            _maintenance_thread = threading.Thread(
+                target=_usage_maintenance_loop, name='usage-maintenance', daemon=True
+            )
+            _maintenance_thread.start()
+
+@app.cli.command('compact-usage')
+@click.option('--retention-days', type=int, default=None, help='Override USAGE_RETENTION_DAYS.')
+def compact_usage_command(retention_days):
+    """Delete raw API usage events older than the retention window."""
+    run = compact_usage_events(retention_days)
+    click.echo(
+        f"compact_usage_events: success={run['success']} skipped={run['skipped']} "
+        f"rows_deleted={run['rows_deleted']} duration_ms={run['duration_ms']} cutoff={run['cutoff']}"
+        + (f" error={run['error']}" if run['error'] else "")
+    )
 
 def get_api_stats(model_id: int):
-    """Aggregate API usage for a given model."""
+    """Usage statistics for a given model.
+
+    Counters come from the in-memory aggregates, latency/resource figures and the
+    daily/hourly charts from api_usage_rollups, so the cost does not grow with the
+    number of raw events.
+    """
     default_stats = {
         'total_copies': 0,
         'total_predictions': 0,
         'success_predictions': 0,
         'failed_predictions': 0,
+        'total_rows_predicted': 0,
         'success_rate': None,
         'avg_latency_ms': None,
+        'latency_min_ms': None,
+        'latency_max_ms': None,
+        'latency_p50_ms': None,
+        'latency_p95_ms': None,
+        'latency_p99_ms': None,
+        'latency_histogram': [],
         'avg_cpu_percent': None,
         'avg_ram_mb': None,
         'last_used_at': None,
         'recent_events': [],
         'daily_counts': [],
+        'hourly_counts': [],
     }
+    stats = default_stats.copy()
+    totals = usage_aggregates.summary(model_id)
+    for key in (
+        'total_copies', 'total_predictions', 'success_predictions', 'failed_predictions',
+        'total_rows_predicted', 'success_rate', 'avg_latency_ms', 'latency_histogram', 'last_used_at',
+    ):
+        stats[key] = totals[key]
+
     conn = get_db_connection()
     if conn is None:
-        return default_stats
-    ensure_api_usage_table(conn)
-    stats = default_stats.copy()
+        return stats
     try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            f"""
+            SELECT
+                SUM(cpu_sum) AS cpu_sum, SUM(cpu_count) AS cpu_count,
+                SUM(ram_sum) AS ram_sum, SUM(ram_count) AS ram_count,
+                MIN(latency_min) AS latency_min, MAX(latency_max) AS latency_max,
+                {', '.join(f"SUM({col}) AS {col}" for col in LATENCY_BUCKET_COLUMNS)}
+            FROM api_usage_rollups
+            WHERE model_id = %s
+            """,
+            (model_id,),
+        )
+        agg = cursor.fetchone() or {}
+        cursor.close()
+        if agg.get('cpu_count'):
+            stats['avg_cpu_percent'] = round(float(agg['cpu_sum']) / float(agg['cpu_count']), 2)
+        if agg.get('ram_count'):
+            stats['avg_ram_mb'] = round(float(agg['ram_sum']) / float(agg['ram_count']), 2)
+        counts = [int(agg.get(col) or 0) for col in LATENCY_BUCKET_COLUMNS]
+        lat_min = float(agg['latency_min']) if agg.get('latency_min') is not None else None
+        lat_max = float(agg['latency_max']) if agg.get('latency_max') is not None else None
+        stats['latency_min_ms'] = lat_min
+        stats['latency_max_ms'] = lat_max
+        stats['latency_p50_ms'] = estimate_latency_percentile(counts, 0.50, lat_min, lat_max)
+        stats['latency_p95_ms'] = estimate_latency_percentile(counts, 0.95, lat_min, lat_max)
+        stats['latency_p99_ms'] = estimate_latency_percentile(counts, 0.99, lat_min, lat_max)
+
         cursor = conn.cursor(dictionary=True)
         cursor.execute(
             """
-            SELECT id, model_id, model_file, event_type, success, latency_ms, cpu_percent, ram_mb, created_at
+            SELECT id, event_type, success, latency_ms, cpu_percent, ram_mb, row_count, created_at
             FROM api_usage_events
             WHERE model_id = %s
             ORDER BY created_at DESC
-            LIMIT 200
+            LIMIT 20
             """,
             (model_id,),
         )
         rows = cursor.fetchall() or []
         cursor.close()
-
-        total_events = len(rows)
-        stats['total_copies'] = sum(1 for r in rows if r.get('event_type') == 'copy')
-        stats['total_predictions'] = sum(1 for r in rows if r.get('event_type') == 'predict')
-        success_predictions = sum(1 for r in rows if r.get('event_type') == 'predict' and r.get('success'))
-        stats['success_predictions'] = success_predictions
-        stats['failed_predictions'] = max(stats['total_predictions'] - success_predictions, 0)
-        success_events = sum(1 for r in rows if r.get('success'))
-        stats['success_rate'] = round(success_events / total_events, 4) if total_events else None
-
-        latencies = [float(r['latency_ms']) for r in rows if r.get('latency_ms') is not None]
-        stats['avg_latency_ms'] = round(sum(latencies) / len(latencies), 2) if latencies else None
-        cpu_vals = [float(r['cpu_percent']) for r in rows if r.get('cpu_percent') is not None]
-        stats['avg_cpu_percent'] = round(sum(cpu_vals) / len(cpu_vals), 2) if cpu_vals else None
-        ram_vals = [float(r['ram_mb']) for r in rows if r.get('ram_mb') is not None]
-        stats['avg_ram_mb'] = round(sum(ram_vals) / len(ram_vals), 2) if ram_vals else None
-
-        stats['last_used_at'] = rows[0]['created_at'].isoformat() if rows else None
+        if stats['last_used_at'] is None and rows:
+            stats['last_used_at'] = rows[0]['created_at'].isoformat()
         stats['recent_events'] = [
             {
                 'id': r.get('id'),
@@ -214,33 +1145,54 @@ def get_api_stats(model_id: int):
                 'latency_ms': r.get('latency_ms'),
                 'cpu_percent': r.get('cpu_percent'),
                 'ram_mb': r.get('ram_mb'),
+                'row_count': r.get('row_count'),
                 'created_at': r.get('created_at').isoformat() if r.get('created_at') else None,
             }
-            for r in rows[:20]
+            for r in rows
         ]
 
-        # Daily aggregation (last 14 days)
-        try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(
-                """
-                SELECT DATE(created_at) as day, COUNT(*) as total
-                FROM api_usage_events
-                WHERE model_id = %s
-                GROUP BY DATE(created_at)
-                ORDER BY day DESC
-                LIMIT 14
-                """,
-                (model_id,),
-            )
-            day_rows = cursor.fetchall() or []
-            cursor.close()
-            stats['daily_counts'] = [
-                {'day': dr['day'].isoformat() if hasattr(dr['day'], 'isoformat') else str(dr['day']), 'total': dr['total']}
-                for dr in reversed(day_rows)
-            ]
-        except MySQLError as e:
-            print("MySQL api usage daily aggregation failed:", str(e))
+        # Daily aggregation (last 14 active days) and hourly aggregation (last 48 hours)
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            """
+            SELECT DATE(bucket_start) AS day, SUM(total_events) AS total, SUM(success_events) AS success
+            FROM api_usage_rollups
+            WHERE model_id = %s
+            GROUP BY DATE(bucket_start)
+            ORDER BY day DESC
+            LIMIT 14
+            """,
+            (model_id,),
+        )
+        day_rows = cursor.fetchall() or []
+        cursor.execute(
+            """
+            SELECT bucket_start, total_events, success_events, latency_count, latency_sum
+            FROM api_usage_rollups
+            WHERE model_id = %s AND bucket_start >= NOW() - INTERVAL 48 HOUR
+            ORDER BY bucket_start
+            """,
+            (model_id,),
+        )
+        hour_rows = cursor.fetchall() or []
+        cursor.close()
+        stats['daily_counts'] = [
+            {
+                'day': dr['day'].isoformat() if hasattr(dr['day'], 'isoformat') else str(dr['day']),
+                'total': int(dr['total'] or 0),
+                'success': int(dr['success'] or 0),
+            }
+            for dr in reversed(day_rows)
+        ]
+        stats['hourly_counts'] = [
+            {
+                'hour': hr['bucket_start'].isoformat(),
+                'total': int(hr['total_events'] or 0),
+                'success': int(hr['success_events'] or 0),
+                'avg_latency_ms': round(float(hr['latency_sum']) / hr['latency_count'], 2) if hr['latency_count'] else None,
+            }
+            for hr in hour_rows
+        ]
     except MySQLError as e:
         print("MySQL api usage stats failed:", str(e))
     finally:
@@ -263,7 +1215,6 @@ def insert_model_metadata(
     conn = get_db_connection()
     if conn is None:
         return
-    ensure_models_table(conn)
     try:
         cursor = conn.cursor()
         cursor.execute(
@@ -292,16 +1243,51 @@ def insert_model_metadata(
         print("MySQL insert failed:", str(e))
     finally:
         conn.close()
+    invalidate_dashboard_stats()
+
+# Columns needed by the model listing (skips the large justification/metrics_json TEXT columns)
+MODEL_LIST_COLUMNS = ['id', 'model_name', 'model_type', 'metric_primary', 'created_at', 'best_algorithm', 'description']
+MODELS_MAX_PAGE_SIZE = int(os.environ.get("MODELS_MAX_PAGE_SIZE", "200"))
+
+def encode_models_cursor(row: Dict[str, Any]) -> str:
+    created_at = row.get('created_at')
+    raw = f"{created_at.isoformat() if created_at else ''}|{row.get('id')}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_models_cursor(cursor_token: str):
+    """Return (created_at, id) from an opaque listing cursor. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor_token.encode('ascii')).decode('utf-8')
+        created_at, model_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(model_id)
+    except Exception:
+        raise ValueError('invalid cursor')
 
-def fetch_models():
+def fetch_models(
+    columns: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    after: Optional[str] = None,
+):
+    """List models newest first.
+
+    columns projects the SELECT (defaults to every column); limit/after give keyset
+    pagination over (created_at, id), where after is a cursor from encode_models_cursor.
+    """
+    select = ", ".join(columns) if columns else "*"
+    where = ""
+    params: List[Any] = []
+    if after:
+        after_created_at, after_id = decode_models_cursor(after)
+        where = "WHERE (created_at < %s OR (created_at = %s AND id < %s))"
+        params.extend([after_created_at, after_created_at, after_id])
+    limit_sql = f" LIMIT {int(limit)}" if limit else ""
     conn = get_db_connection()
     if conn is None:
         return []
-    ensure_models_table(conn)
     rows = []
     try:
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM models ORDER BY created_at DESC")
+        cursor.execute(f"SELECT {select} FROM models {where} ORDER BY created_at DESC, id DESC{limit_sql}", params)
         rows = cursor.fetchall()
         cursor.close()
     except MySQLError as e:
@@ -314,7 +1300,6 @@ def fetch_model_by_id(model_id: int):
     conn = get_db_connection()
     if conn is None:
         return None
-    ensure_models_table(conn)
     row = None
     try:
         cursor = conn.cursor(dictionary=True)
@@ -331,7 +1316,6 @@ def fetch_model_by_file(model_file: str):
     conn = get_db_connection()
     if conn is None:
         return None
-    ensure_models_table(conn)
     row = None
     try:
         cursor = conn.cursor(dictionary=True)
@@ -349,8 +1333,6 @@ def delete_model_and_usage(model_id: int):
     conn = get_db_connection()
     if conn is None:
         raise RuntimeError("DB connection unavailable")
-    ensure_models_table(conn)
-    ensure_api_usage_table(conn)
     # Fetch model for file cleanup
     cursor = conn.cursor(dictionary=True)
     cursor.execute("SELECT * FROM models WHERE id = %s", (model_id,))
@@ -359,16 +1341,21 @@ def delete_model_and_usage(model_id: int):
         cursor.close()
         conn.close()
         return None
-    # Delete usage events first (best effort)
+    # Delete usage events first (best effort), after discarding the ones still buffered
+    usage_writer.forget(model_id)
     try:
-        cursor.execute("DELETE FROM api_usage_events WHERE model_id = %s", (model_id,))
+        delete_in_chunks(conn, 'api_usage_events', 'model_id = %s', (model_id,))
+        cursor.execute("DELETE FROM api_usage_totals WHERE model_id = %s", (model_id,))
+        cursor.execute("DELETE FROM api_usage_rollups WHERE model_id = %s", (model_id,))
     except MySQLError as e:
         print("MySQL delete api_usage_events failed:", str(e))
+    usage_aggregates.forget(model_id)
     # Delete model row
     cursor.execute("DELETE FROM models WHERE id = %s", (model_id,))
     conn.commit()
     cursor.close()
     conn.close()
+    invalidate_dashboard_stats()
 
     # Remove artifacts on disk
     models_dir = os.path.join(os.path.dirname(__file__), 'models')
@@ -380,72 +1367,986 @@ def delete_model_and_usage(model_id: int):
                     os.remove(fpath)
             except Exception as e:
                 print("File delete failed:", fpath, str(e))
+            artifact_cache.invalidate(fpath)
     return model_row
 
-def compute_global_stats(models: List[Dict[str, Any]]):
-    stats = defaultdict(int)
-    precisions = []
-    for m in models:
-        stats['total'] += 1
-        mtype = (m.get('model_type') or '').lower()
-        if mtype == 'classification':
-            stats['classification'] += 1
-        elif mtype == 'regression':
-            stats['regression'] += 1
-        # try to parse precision from justification if present
-        # (for real precision, frontend should store metrics; here best effort)
-        try:
-            # e.g., "precision (0.9876)" pattern not guaranteed
-            pass
-        except Exception:
-            pass
-        try:
-            p = m.get('metric_primary')
-            if p is not None:
-                p = float(p)
-                precisions.append(p)
-        except Exception:
+def compute_global_stats():
+    """Registry-wide counters computed with SQL aggregates (no per-row Python loop)."""
+    stats = {
+        'total_models': 0,
+        'classification_models': 0,
+        'regression_models': 0,
+        'average_precision': None,
+    }
+    conn = get_db_connection()
+    if conn is None:
+        return stats
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            """
+            SELECT
+                COUNT(*) AS total,
+                SUM(LOWER(model_type) = 'classification') AS classification,
+                SUM(LOWER(model_type) = 'regression') AS regression,
+                AVG(metric_primary) AS avg_precision
+            FROM models
+            """
+        )
+        row = cursor.fetchone() or {}
+        cursor.close()
+        stats['total_models'] = int(row.get('total') or 0)
+        stats['classification_models'] = int(row.get('classification') or 0)
+        stats['regression_models'] = int(row.get('regression') or 0)
+        if row.get('avg_precision') is not None:
+            stats['average_precision'] = round(float(row['avg_precision']), 4)
+    except MySQLError as e:
+        print("MySQL global stats failed:", str(e))
+    finally:
+        conn.close()
+    return stats
+
+# Cached dashboard stats; invalidated on train/delete, TTL bounds staleness across workers
+DASHBOARD_STATS_TTL_S = float(os.environ.get("DASHBOARD_STATS_TTL_S", "30"))
+_dashboard_stats_cache: Dict[str, Any] = {'value': None, 'expires_at': 0.0}
+_dashboard_stats_lock = threading.Lock()
+
+def get_dashboard_stats() -> Dict[str, Any]:
+    with _dashboard_stats_lock:
+        if _dashboard_stats_cache['value'] is not None and time.monotonic() < _dashboard_stats_cache['expires_at']:
+            return _dashboard_stats_cache['value']
+    stats = compute_global_stats()
+    with _dashboard_stats_lock:
+        _dashboard_stats_cache['value'] = stats
+        _dashboard_stats_cache['expires_at'] = time.monotonic() + DASHBOARD_STATS_TTL_S
+    return stats
+
+def invalidate_dashboard_stats():
+    with _dashboard_stats_lock:
+        _dashboard_stats_cache['value'] = None
+
+# ---- Compiled payload preprocessor ----
+
+def compile_preprocessor(input_features: List[str], label_encoders: Dict[str, Any], scaler) -> Dict[str, Any]:
+    """Flatten the fitted encoders/scaler into plain lookups for NumPy-only inference.
+
+    Stored as a dict of builtins/ndarrays (not a custom class) so artifacts unpickle
+    regardless of the module the API is launched from.
+    """
+    n_features = len(input_features)
+    categories = {}
+    for col, enc in (label_encoders or {}).items():
+        if col == 'target' or col not in input_features:
             continue
-    avg_precision = round(sum(precisions) / len(precisions), 4) if precisions else None
+        categories[col] = {str(c): i for i, c in enumerate(enc.classes_)}
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
     return {
-        'total_models': stats['total'],
-        'classification_models': stats['classification'],
-        'regression_models': stats['regression'],
-        'average_precision': avg_precision
+        'features': list(input_features),
+        'categories': categories,
+        # unseen categories fall back to the first known class (code 0)
+        'unknown_code': 0,
+        'mean': np.ascontiguousarray(mean, dtype=np.float64) if mean is not None else np.zeros(n_features),
+        'scale': np.ascontiguousarray(scale, dtype=np.float64) if scale is not None else np.ones(n_features),
     }
 
+def _encode_column(preprocessor: Dict[str, Any], feat: str, values: List[Any], out: np.ndarray):
+    lookup = preprocessor['categories'].get(feat)
+    if lookup is None:
+        out[:] = np.asarray(values, dtype=np.float64)
+    else:
+        unknown = preprocessor['unknown_code']
+        out[:] = np.fromiter((lookup.get(str(v), unknown) for v in values), dtype=np.float64, count=len(values))
+
+def encode_rows(preprocessor: Dict[str, Any], rows: List[Dict[str, Any]]) -> np.ndarray:
+    """Encode and scale a list of row objects into a C-contiguous float64 matrix."""
+    features = preprocessor['features']
+    X = np.empty((len(rows), len(features)), dtype=np.float64, order='F')
+    for j, feat in enumerate(features):
+        _encode_column(preprocessor, feat, [r.get(feat) for r in rows], X[:, j])
+    X -= preprocessor['mean']
+    X /= preprocessor['scale']
+    return np.ascontiguousarray(X)
+
+def encode_columns(preprocessor: Dict[str, Any], columns: Dict[str, List[Any]], n_rows: int) -> np.ndarray:
+    """Same as encode_rows for columnar input ({feature: [values...]})."""
+    features = preprocessor['features']
+    X = np.empty((n_rows, len(features)), dtype=np.float64, order='F')
+    for j, feat in enumerate(features):
+        _encode_column(preprocessor, feat, columns.get(feat) or [None] * n_rows, X[:, j])
+    X -= preprocessor['mean']
+    X /= preprocessor['scale']
+    return np.ascontiguousarray(X)
+
+def load_model_artifact(file_path: str) -> Dict[str, Any]:
+    """Load an artifact from disk, compiling its preprocessor if it predates them."""
+    artifact = joblib.load(file_path)
+    if isinstance(artifact, dict) and 'preprocessor' not in artifact:
+        artifact['preprocessor'] = compile_preprocessor(
+            artifact.get('input_features', []),
+            artifact.get('label_encoders', {}),
+            artifact.get('scaler'),
+        )
+    return artifact
+
+# ---- Model artifact cache ----
+
+class ArtifactCache:
+    """Bounded in-process LRU cache of loaded model artifacts.
+
+    Entries are keyed by absolute file path and validated against the file's
+    mtime/size, so an artifact rewritten on disk is reloaded transparently.
+    Eviction is by total on-disk size of the cached artifacts.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry['size']
+        return entry
+
+    def get(self, file_path: str):
+        """Return the artifact stored at file_path, loading it on a miss."""
+        key = os.path.abspath(file_path)
+        st = os.stat(key)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['signature'] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['artifact']
+            self.misses += 1
+        artifact = load_model_artifact(key)
+        with self._lock:
+            self._drop(key)
+            if st.st_size <= self.max_bytes:
+                self._entries[key] = {'signature': signature, 'size': st.st_size, 'artifact': artifact}
+                self.total_bytes += st.st_size
+                while self.total_bytes > self.max_bytes and self._entries:
+                    oldest = next(iter(self._entries))
+                    self._drop(oldest)
+                    self.evictions += 1
+        return artifact
+
+    def invalidate(self, file_path: str):
+        with self._lock:
+            if self._drop(os.path.abspath(file_path)) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+artifact_cache = ArtifactCache(
+    max_bytes=int(float(os.environ.get("ARTIFACT_CACHE_MAX_MB", "512")) * 1024 * 1024)
+)
+
 @app.route('/', methods=['GET'])
 def index():
     return jsonify({'message': 'ML-OPS Backend API', 'status': 'running'})
 
 
-def robust_read_csv(csv_string: str):
-    """Try to read a CSV string with automatic/several common separators.
+# CSV parsing: separator sniffed on a bounded sample, then one pass of a fast engine
+CSV_SNIFF_BYTES = int(os.environ.get("CSV_SNIFF_BYTES", str(64 * 1024)))
+CSV_ENGINE = os.environ.get("CSV_ENGINE", "c")  # 'c' or 'pyarrow' (when installed)
+CSV_SEPARATORS = [';', ',', '\t', '|']
+
+def sniff_separator(sample: str) -> str:
+    """Guess the field separator from the first lines of a CSV."""
+    lines = sample.splitlines()
+    if len(lines) > 1 and not sample.endswith(('\n', '\r')):
+        lines = lines[:-1]  # drop the truncated last line
+    lines = [line for line in lines if line.strip()][:50]
+    if not lines:
+        return ','
+    try:
+        return csv.Sniffer().sniff("\n".join(lines), delimiters=''.join(CSV_SEPARATORS)).delimiter
+    except csv.Error:
+        # most frequent candidate in the header that also appears on every other line
+        header = lines[0]
+        candidates = [sep for sep in CSV_SEPARATORS if sep in header]
+        consistent = [sep for sep in candidates if all(sep in line for line in lines[1:])]
+        return max(consistent or candidates or [','], key=header.count)
+
+def _csv_engine() -> str:
+    if CSV_ENGINE == 'pyarrow':
+        try:
+            import pyarrow  # noqa: F401
+            return 'pyarrow'
+        except ImportError:
+            pass
+    return 'c'
+
+def robust_read_csv(csv_string: Optional[str] = None, path: Optional[str] = None, usecols=None, dtype=None):
+    """Read a CSV string (or a file at `path`) whatever its separator (`,`, `;`, tab, `|`).
+
+    The separator is sniffed from the first CSV_SNIFF_BYTES only, then the data
+    is parsed once with the C (or pyarrow) engine. `usecols` restricts parsing to
+    some columns and `dtype` passes type hints to pandas. Falls back to pandas'
+    python-engine autodetection if the fast parse fails. Returns a
+    pandas.DataFrame or raises the parser's exception.
+    """
+    if path is not None:
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            sample = f.read(CSV_SNIFF_BYTES)
+    else:
+        if not isinstance(csv_string, str):
+            raise ValueError('csv_data must be a CSV string')
+        sample = csv_string[:CSV_SNIFF_BYTES]
+    # bytes rather than io.StringIO: the parser then reads the UTF-8 buffer directly
+    # instead of a 4-byte-per-character copy of the whole string
+    source = (lambda: path) if path is not None else (lambda: io.BytesIO(csv_string.encode('utf-8')))
+    usecols = list(dict.fromkeys(usecols)) if usecols else None
+    sep = sniff_separator(sample)
+    try:
+        return pd.read_csv(source(), sep=sep, engine=_csv_engine(), usecols=usecols, dtype=dtype)
+    except (pd.errors.ParserError, UnicodeDecodeError) as e_fast:
+        try:
+            return pd.read_csv(source(), sep=None, engine="python", usecols=usecols, dtype=dtype)
+        except Exception:
+            raise e_fast
+
+# ---- Streaming uploads ----
+
+# Limit on the (decompressed) size of a CSV upload
+UPLOAD_MAX_BYTES = int(float(os.environ.get("UPLOAD_MAX_MB", "1024")) * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_TMP_DIR = os.environ.get("UPLOAD_TMP_DIR") or None
+
+class UploadError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+def upload_compression(content_encoding: Optional[str], filename: str = '', mimetype: str = '') -> Optional[str]:
+    """'gzip', 'zstd' or None, from the Content-Encoding header, file extension or mimetype."""
+    encoding = (content_encoding or '').strip().lower()
+    filename = (filename or '').lower()
+    if encoding in ('gzip', 'x-gzip') or filename.endswith('.gz') or mimetype in ('application/gzip', 'application/x-gzip'):
+        return 'gzip'
+    if encoding == 'zstd' or filename.endswith(('.zst', '.zstd')) or mimetype == 'application/zstd':
+        return 'zstd'
+    if encoding not in ('', 'identity'):
+        raise UploadError(f"Unsupported Content-Encoding: {encoding}", 415)
+    return None
+
+def spool_upload(stream, compression: Optional[str] = None, max_bytes: Optional[int] = None) -> str:
+    """Copy an upload stream to a temp file chunk by chunk, decompressing on the fly.
+
+    Memory stays bounded by UPLOAD_CHUNK_SIZE whatever the upload size; raises
+    UploadError(413) as soon as the decompressed size exceeds max_bytes. Returns
+    the temp file path (the caller removes it).
+    """
+    max_bytes = UPLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    if compression == 'gzip':
+        reader = gzip.GzipFile(fileobj=stream, mode='rb')
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise UploadError('zstd uploads require the zstandard package', 415)
+        reader = zstandard.ZstdDecompressor().stream_reader(stream)
+    else:
+        reader = stream
+    fd, path = tempfile.mkstemp(prefix='mlops_upload_', suffix='.csv', dir=UPLOAD_TMP_DIR)
+    total = 0
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = reader.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_bytes:
+                    raise UploadError(f"Upload exceeds the {max_bytes} byte limit", 413)
+                out.write(chunk)
+    except UploadError:
+        os.remove(path)
+        raise
+    except (OSError, EOFError, ValueError) as e:
+        # corrupt or truncated compressed stream
+        os.remove(path)
+        if zstandard is not None and isinstance(e, zstandard.ZstdError):
+            raise UploadError(f"Invalid zstd upload: {e}")
+        raise UploadError(f"Invalid {compression or 'CSV'} upload: {e}")
+    return path
+
+@contextmanager
+def request_csv_source():
+    """Yield (csv_string, path, fields) for the CSV of the current request.
+
+    Accepts the legacy JSON body ({"csv_data": "..."}), a multipart form with a
+    'file' part, or a raw CSV body (text/csv, application/octet-stream, ...),
+    optionally gzip/zstd compressed. Non-JSON uploads are spooled to disk (path
+    set, csv_string None) and the temp file is removed on exit.
+    """
+    if request.is_json:
+        data = request.json or {}
+        yield data.get('csv_data'), None, data
+        return
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            raise UploadError("Missing 'file' part in multipart upload")
+        fields = request.form.to_dict()
+        compression = upload_compression(upload.headers.get('Content-Encoding'), upload.filename, upload.mimetype)
+        path = spool_upload(upload.stream, compression)
+    else:
+        fields = request.args.to_dict()
+        if request.content_length and request.content_length > UPLOAD_MAX_BYTES:
+            raise UploadError(f"Upload exceeds the {UPLOAD_MAX_BYTES} byte limit", 413)
+        compression = upload_compression(request.headers.get('Content-Encoding'), fields.get('filename', ''), request.mimetype)
+        path = spool_upload(request.stream, compression)
+    try:
+        yield None, path, fields
+    finally:
+        os.remove(path)
+
+def dataframe_from_request():
+    """Read the CSV of the current request and return (DataFrame, other fields)."""
+    with request_csv_source() as (csv_string, path, fields):
+        return robust_read_csv(csv_string, path=path), fields
+
+# ---- CSV preview and profiling ----
+
+PREVIEW_KB = int(os.environ.get("PREVIEW_KB", "256"))
+PROFILE_CHUNK_ROWS = int(os.environ.get("PROFILE_CHUNK_ROWS", "50000"))
+PROFILE_SAMPLE_SIZE = int(os.environ.get("PROFILE_SAMPLE_SIZE", "10000"))
+PROFILE_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+def _csv_size(csv_string: Optional[str], path: Optional[str]) -> int:
+    # characters for in-memory strings, bytes for files: only used as a ratio
+    return os.path.getsize(path) if path is not None else len(csv_string)
+
+def _csv_head(csv_string: Optional[str], path: Optional[str], size: int) -> str:
+    """The first `size` bytes/characters of the CSV, cut after the last complete line."""
+    if path is not None:
+        with open(path, 'rb') as f:
+            head = f.read(size)
+        complete = len(head) < size
+        head = head.decode('utf-8', errors='replace')
+    else:
+        if not isinstance(csv_string, str):
+            raise ValueError('csv_data must be a CSV string')
+        head = csv_string[:size]
+        complete = len(csv_string) <= size
+    if not complete and '\n' in head:
+        head = head[:head.rindex('\n') + 1]
+    return head
+
+def preview_csv(csv_string: Optional[str] = None, path: Optional[str] = None, preview_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """Columns, sample rows and dtypes from the first preview_bytes of a CSV only.
+
+    The row count is estimated from the average row size in the sample (exact
+    when the whole CSV fits in the sample).
+    """
+    preview_bytes = preview_bytes or PREVIEW_KB * 1024
+    total = _csv_size(csv_string, path)
+    head = _csv_head(csv_string, path, preview_bytes)
+    df = robust_read_csv(head)
+    # sizes in the unit of _csv_size: bytes for files, characters for strings
+    measure = (lambda text: len(text.encode('utf-8'))) if path is not None else len
+    head_size = measure(head)
+    if head_size >= total or len(df) == 0:
+        row_count, exact = len(df), True
+    else:
+        # rows in the sample scaled by the byte offset ratio (header excluded)
+        header_size = measure(head.split('\n', 1)[0]) + 1
+        row_count = int(round(len(df) * (total - header_size) / max(1, head_size - header_size)))
+        exact = False
+    return {
+        'columns': df.columns.tolist(),
+        'sample_data': df.head(5).to_dict('records'),
+        'row_count': row_count,
+        'row_count_exact': exact,
+        'column_types': df.dtypes.astype(str).to_dict(),
+        'preview_bytes': preview_bytes,
+    }
+
+class HyperLogLog:
+    """Approximate distinct counter (about 1.6% standard error with p=12, 4 KB of registers)."""
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = (hashes & np.uint64((1 << (64 - self.p)) - 1)).astype(np.float64)
+        # rank = position of the leftmost 1-bit in the remaining 64-p bits
+        _, bit_length = np.frexp(rest)
+        rank = (64 - self.p) - bit_length + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * np.log(self.m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+class ReservoirSample:
+    """Uniform fixed-size sample of a numeric stream, used as a quantile sketch."""
+    def __init__(self, size: int, seed: int = 42):
+        self.size = size
+        self.values = np.empty(size, dtype=np.float64)
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, values: np.ndarray):
+        n = len(values)
+        fill = min(n, max(0, self.size - self.seen))
+        if fill:
+            self.values[self.seen:self.seen + fill] = values[:fill]
+        rest = values[fill:]
+        if len(rest):
+            # Algorithm R, vectorised: item i replaces a random slot with probability size/(i+1)
+            positions = np.arange(self.seen + fill, self.seen + n) + 1
+            slots = (self.rng.random(len(rest)) * positions).astype(np.int64)
+            keep = slots < self.size
+            self.values[slots[keep]] = rest[keep]
+        self.seen += n
+
+    def quantiles(self, qs) -> Dict[str, float]:
+        sample = self.values[:min(self.seen, self.size)]
+        if len(sample) == 0:
+            return {}
+        return {f"p{int(q * 100)}": float(v) for q, v in zip(qs, np.quantile(sample, qs))}
+
+def profile_csv(csv_string: Optional[str] = None, path: Optional[str] = None, numeric_columns=None) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+    """Per-column statistics in one chunked pass with bounded memory.
+
+    Returns (row_count, {column: stats}) where stats hold the null count,
+    an approximate distinct count (HyperLogLog) and, for numeric columns,
+    min/max/mean and approximate quantiles from a reservoir sample.
+    """
+    sep = sniff_separator(_csv_head(csv_string, path, CSV_SNIFF_BYTES))
+    source = path if path is not None else io.StringIO(csv_string)
+    numeric_columns = set(numeric_columns or [])
+    stats: Dict[str, Dict[str, Any]] = {}
+    rows = 0
+    for chunk in pd.read_csv(source, sep=sep, chunksize=PROFILE_CHUNK_ROWS):
+        rows += len(chunk)
+        for col in chunk.columns:
+            state = stats.get(col)
+            if state is None:
+                state = stats[col] = {'nulls': 0, 'hll': HyperLogLog()}
+                if col in numeric_columns:
+                    state.update(min=np.inf, max=-np.inf, sum=0.0, count=0, sample=ReservoirSample(PROFILE_SAMPLE_SIZE))
+            series = chunk[col]
+            if 'sample' in state:
+                series = pd.to_numeric(series, errors='coerce')
+            present = series.dropna()
+            state['nulls'] += len(series) - len(present)
+            state['hll'].add_hashes(pd.util.hash_pandas_object(present, index=False).to_numpy())
+            if 'sample' in state and len(present):
+                values = present.to_numpy(dtype=np.float64)
+                state['min'] = min(state['min'], float(values.min()))
+                state['max'] = max(state['max'], float(values.max()))
+                state['sum'] += float(values.sum())
+                state['count'] += len(values)
+                state['sample'].add(values)
+    profile = {}
+    for col, state in stats.items():
+        entry = {'nulls': state['nulls'], 'distinct_approx': state['hll'].count()}
+        if 'sample' in state and state['count']:
+            entry.update(
+                min=state['min'],
+                max=state['max'],
+                mean=state['sum'] / state['count'],
+                quantiles_approx=state['sample'].quantiles(PROFILE_QUANTILES),
+            )
+        profile[col] = entry
+    return rows, profile
+
+# ---- Dataset store ----
+
+# Uploaded datasets are parsed once and kept column by column as .npy files so
+# /api/train and previews can reference them by id instead of re-sending the CSV;
+# kept outside models/, whose files /api/download-model serves
+DATASETS_DIR = os.environ.get("DATASETS_DIR") or os.path.join(os.path.dirname(__file__), 'datasets')
+
+def is_text_dtype(dtype) -> bool:
+    """True for object/string/categorical columns (encoded as category codes)."""
+    return dtype == 'object' or isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+def _dataset_path(dataset_id: str) -> str:
+    if not dataset_id or len(dataset_id) != 32 or not all(ch in '0123456789abcdef' for ch in dataset_id):
+        raise ValueError('Invalid dataset_id')
+    return os.path.join(DATASETS_DIR, dataset_id)
 
-    Returns a pandas.DataFrame or raises the last exception.
+def _ensure_dir(path: str) -> str:
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def save_dataset(df: pd.DataFrame, name: Optional[str] = None) -> Dict[str, Any]:
+    """Store a parsed DataFrame and return its metadata (including dataset_id).
+
+    Numeric, boolean and datetime columns are saved as their NumPy arrays (memory-mapped
+    on load); text columns as int32 category codes with the categories in meta.json,
+    so no pickled objects hit the disk.
     """
-    import pandas as _pd
-    import io as _io
+    dataset_id = uuid.uuid4().hex
+    final_dir = _dataset_path(dataset_id)
+    tmp_dir = tempfile.mkdtemp(prefix='.upload_', dir=_ensure_dir(DATASETS_DIR))
+    columns = []
+    for position, col in enumerate(df.columns):
+        series = df[col]
+        entry = {'name': str(col), 'dtype': str(series.dtype), 'file': f'c{position}.npy'}
+        if is_text_dtype(series.dtype):
+            codes, categories = pd.factorize(series, use_na_sentinel=True)
+            np.save(os.path.join(tmp_dir, entry['file']), codes.astype(np.int32))
+            entry['encoding'] = 'categorical'
+            entry['categories'] = [c if isinstance(c, (str, int, float, bool)) else str(c) for c in categories.tolist()]
+        else:
+            np.save(os.path.join(tmp_dir, entry['file']), series.to_numpy())
+            entry['encoding'] = 'numpy'
+        columns.append(entry)
+    meta = {
+        'dataset_id': dataset_id,
+        'name': name,
+        'row_count': int(len(df)),
+        'columns': columns,
+        'created_at': datetime.utcnow().isoformat(),
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_dir, final_dir)
+    return meta
 
-    # First try pandas autodetect (engine='python', sep=None)
+def load_dataset_meta(dataset_id: str) -> Dict[str, Any]:
+    path = _dataset_path(dataset_id)
     try:
-        return _pd.read_csv(_io.StringIO(csv_string), sep=None, engine="python")
-    except Exception as e_auto:
-        last_exc = e_auto
-        # Try common separators
-        for sep in [';', ',', '\t']:
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f'Dataset {dataset_id} not found')
+
+def load_dataset(dataset_id: str, columns: Optional[List[str]] = None, rows: Optional[slice] = None) -> pd.DataFrame:
+    """Rebuild a stored dataset, optionally limited to some columns and a row slice.
+
+    Text columns come back as object dtype with NaN for missing values, exactly like
+    robust_read_csv would produce them.
+    """
+    meta = load_dataset_meta(dataset_id)
+    path = _dataset_path(dataset_id)
+    by_name = {c['name']: c for c in meta['columns']}
+    wanted = list(by_name) if columns is None else columns
+    missing = [c for c in wanted if c not in by_name]
+    if missing:
+        raise ValueError(f"Unknown column(s) in dataset: {', '.join(map(str, missing))}")
+    data = {}
+    for name in wanted:
+        entry = by_name[name]
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if rows is not None:
+            values = values[rows]
+        if entry['encoding'] == 'categorical':
+            lookup = np.empty(len(entry['categories']) + 1, dtype=object)
+            lookup[:-1] = entry['categories']
+            lookup[-1] = np.nan
+            data[name] = lookup[np.asarray(values)]
+        else:
+            data[name] = np.array(values)
+    return pd.DataFrame(data, columns=wanted)
+
+def list_datasets() -> List[Dict[str, Any]]:
+    datasets = []
+    if not os.path.isdir(DATASETS_DIR):
+        return datasets
+    for dataset_id in os.listdir(DATASETS_DIR):
+        if dataset_id.startswith('.'):
+            continue
+        try:
+            meta = load_dataset_meta(dataset_id)
+        except (ValueError, OSError):
+            continue
+        datasets.append(dataset_summary(meta))
+    datasets.sort(key=lambda d: d['created_at'] or '', reverse=True)
+    return datasets
+
+def dataset_summary(meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'dataset_id': meta['dataset_id'],
+        'name': meta.get('name'),
+        'row_count': meta['row_count'],
+        'columns': [c['name'] for c in meta['columns']],
+        'column_types': {c['name']: c['dtype'] for c in meta['columns']},
+        'created_at': meta.get('created_at'),
+    }
+
+def delete_dataset(dataset_id: str) -> bool:
+    path = _dataset_path(dataset_id)
+    if not os.path.isdir(path):
+        return False
+    shutil.rmtree(path)
+    return True
+
+# ---- Training result cache ----
+
+# Bump when the evaluation protocol (split, scaling, metrics) changes so stale entries are ignored
+TRAIN_CACHE_VERSION = "1"
+
+class TrainingResultCache:
+    """Disk cache of per-algorithm benchmark results keyed by dataset fingerprint.
+
+    Entries live under <directory>/<dataset_key>/<entry_key>.pkl and hold the
+    result dict (and, when store_models is set, the fitted estimator). The
+    dataset key hashes the preprocessed data, features, target, model type and
+    label encodings; the entry key hashes the algorithm name, class and params,
+    so a request with a changed algorithm set only trains the new ones. Eviction
+    is least-recently-used by total size, using file mtimes as access times so
+    the order survives restarts.
+    """
+    def __init__(self, directory: str, max_bytes: int, store_models: bool = False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.store_models = store_models
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def dataset_key(X, y, input_features, output_feature, model_type, label_encoders) -> str:
+        digest = hashlib.sha256()
+        header = {
+            'version': TRAIN_CACHE_VERSION,
+            'features': list(input_features or []),
+            'target': output_feature,
+            'model_type': model_type,
+            'dtypes': [str(t) for t in X.dtypes],
+            'encodings': {col: [str(c) for c in enc.classes_] for col, enc in sorted(label_encoders.items())},
+        }
+        digest.update(json.dumps(header, sort_keys=True).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(X, index=False).values.tobytes())
+        digest.update(pd.util.hash_pandas_object(pd.Series(np.asarray(y)), index=False).values.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def algorithm_key(name: str, model) -> str:
+        params = sorted((k, repr(v)) for k, v in model.get_params().items())
+        config = f"{name}|{type(model).__module__}.{type(model).__qualname__}|{params}"
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, dataset_key: str, entry_key: str) -> str:
+        return os.path.join(self.directory, dataset_key, f"{entry_key}.pkl")
+
+    def _load_index(self):
+        """Build the LRU index from the cache directory (oldest mtime first)."""
+        if self._index is not None:
+            return
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for fname in names:
+                if fname.endswith('.pkl'):
+                    path = os.path.join(root, fname)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, path, st.st_size))
+        files.sort()
+        self._index = OrderedDict((path, size) for _, path, size in files)
+        self.total_bytes = sum(self._index.values())
+
+    def _remove(self, path: str):
+        self.total_bytes -= self._index.pop(path, 0)
+        try:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+
+    def get(self, dataset_key: str, entry_key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        path = self._path(dataset_key, entry_key)
+        with self._lock:
+            self._load_index()
+            cached = path in self._index
+        # (de)serialization runs outside the lock so one large entry does not block
+        # every other request; a file evicted meanwhile simply reads as a miss
+        entry = None
+        if cached:
             try:
-                return _pd.read_csv(_io.StringIO(csv_string), sep=sep)
+                entry = joblib.load(path)
+                os.utime(path)
             except Exception as e:
-                last_exc = e
-        # If all attempts fail, raise the last exception
-        raise last_exc
+                print('training cache read failed:', str(e))
+        with self._lock:
+            if entry is None:
+                if cached:
+                    self._remove(path)
+                self.misses += 1
+                return None
+            if path in self._index:
+                self._index.move_to_end(path)
+            self.hits += 1
+            return entry
+
+    def put(self, dataset_key: str, entry_key: str, entry: Dict[str, Any]):
+        if not self.enabled:
+            return
+        path = self._path(dataset_key, entry_key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            joblib.dump(entry, tmp_path)
+        except Exception as e:
+            print('training cache write failed:', str(e))
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._load_index()
+            try:
+                # eviction may have removed the (then empty) dataset directory meanwhile
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                size = os.path.getsize(path)
+            except Exception as e:
+                print('training cache write failed:', str(e))
+                return
+            self.total_bytes -= self._index.pop(path, 0)
+            self._index[path] = size
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and self._index:
+                self._remove(next(iter(self._index)))
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._index) if self._index is not None else None,
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'store_models': self.store_models,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+            }
+
+training_result_cache = TrainingResultCache(
+    # outside models/: /api/download-model serves any file under it
+    directory=os.environ.get("TRAIN_CACHE_DIR") or os.path.join(os.path.dirname(__file__), 'train_cache'),
+    max_bytes=int(float(os.environ.get("TRAIN_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    store_models=os.environ.get("TRAIN_CACHE_STORE_MODELS", "0") == "1",
+)
+
+class TrainingCancelled(Exception):
+    """Raised inside MLModelTrainer when its cancel_event is set."""
+
+FINALIZE_POLICIES = ('holdout', 'warm_start', 'full')
+TRAIN_FINALIZE_POLICY = os.environ.get("TRAIN_FINALIZE_POLICY", "full")
+
+# Opt-in per-stage memory profiling (overridable per request with "profile_memory"):
+# tracemalloc slows allocations down, so it is off by default, except for low_memory
+# runs, whose point is the memory they save
+TRAIN_PROFILE_MEMORY = os.environ.get("TRAIN_PROFILE_MEMORY", "0") == "1"
+# Opt-in float32 training (overridable per request with "low_memory")
+TRAIN_LOW_MEMORY = os.environ.get("TRAIN_LOW_MEMORY", "0") == "1"
+# Float feature columns are stored as float32 in the preprocessed matrix (overridable
+# per request with "float32_features"); the other columns are int8/int16 codes already
+TRAIN_FLOAT32_FEATURES = os.environ.get("TRAIN_FLOAT32_FEATURES", "1") == "1"
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+def _start_tracemalloc():
+    # reference-counted so concurrent profiled trainings share one tracing session
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+@contextmanager
+def timed_stage(timings: Dict[str, float], name: str, memory: Optional[Dict[str, Any]] = None):
+    """Record the wall-clock seconds spent in a block under timings[name] and, when
+    memory is given, its traced allocations under memory[name].
+
+    The numbers come from tracemalloc and are process-wide: allocations made by
+    other threads (concurrent requests or jobs) during the block are counted too,
+    worker processes are not (see MLModelTrainer.worker_memory).
+    """
+    if memory is not None:
+        _start_tracemalloc()
+        traced_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
+        if memory is not None:
+            traced_end, traced_peak = tracemalloc.get_traced_memory()
+            _stop_tracemalloc()
+            memory[name] = {
+                'process_peak_mb': round(max(0, traced_peak - traced_start) / (1024 * 1024), 2),
+                'process_delta_mb': round((traced_end - traced_start) / (1024 * 1024), 2),
+            }
+
+def downcast_numeric(df: pd.DataFrame, exclude=()) -> pd.DataFrame:
+    """float64 columns to float32 and integer columns to their smallest type (low-memory mode)."""
+    for col in df.columns:
+        if col in exclude:
+            continue
+        dtype = df[col].dtype
+        if pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+            df[col] = df[col].astype(np.float32)
+        elif pd.api.types.is_integer_dtype(dtype):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+# Parallel training defaults (overridable per /api/train request)
+TRAIN_N_JOBS = int(os.environ.get("TRAIN_N_JOBS", "1"))
+TRAIN_ALGORITHM_TIMEOUT_S = float(os.environ.get("TRAIN_ALGORITHM_TIMEOUT_S", "0"))
+TRAIN_MP_START_METHOD = os.environ.get("TRAIN_MP_START_METHOD", "")
+
+# Model selection: 'full' trains every candidate on the whole split, 'halving' runs
+# successive halving on growing stratified subsamples within TRAIN_TIME_BUDGET_S
+SELECTION_MODES = ('full', 'halving')
+TRAIN_SELECTION_MODE = os.environ.get("TRAIN_SELECTION_MODE", "full")
+TRAIN_TIME_BUDGET_S = float(os.environ.get("TRAIN_TIME_BUDGET_S", "0"))
+HALVING_MIN_SAMPLES = int(os.environ.get("HALVING_MIN_SAMPLES", "1000"))
+HALVING_FACTOR = int(os.environ.get("HALVING_FACTOR", "3"))
+
+def _load_shared_array(path: str):
+    try:
+        return np.load(path, mmap_mode='r')
+    except ValueError:
+        # object arrays cannot be memory-mapped
+        return np.load(path, allow_pickle=True)
+
+def _worker_peak_memory(rss_start: int) -> Optional[Dict[str, float]]:
+    """This worker's peak RSS (ru_maxrss) and its growth over the RSS it started from."""
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {
+        'peak_rss_mb': round(peak / (1024 * 1024), 2),
+        'delta_mb': round(max(0, peak - rss_start) / (1024 * 1024), 2),
+    }
+
+def _evaluate_algorithm_worker(conn, model_type, name, model, data_dir, return_model=False, profile_memory=False):
+    """Worker process entry point: fit one algorithm on the shared split and send back its result
+    (and the fitted estimator when return_model is set, and its own peak memory when profiling)."""
+    try:
+        rss_start = psutil.Process().memory_info().rss if profile_memory else 0
+        arrays = [_load_shared_array(os.path.join(data_dir, f'{key}.npy')) for key in ('X_train', 'X_test', 'y_train', 'y_test')]
+        result = MLModelTrainer(model_type).evaluate_algorithm(name, model, *arrays)
+        worker_memory = _worker_peak_memory(rss_start) if profile_memory else None
+        conn.send(('ok', (result, model if return_model else None), worker_memory))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
 
 class MLModelTrainer:
-    def __init__(self, model_type):
+    def __init__(
+        self, model_type, n_jobs=None, algorithm_timeout=None, keep_fitted=False,
+        progress_callback=None, cancel_event=None, selection=None, time_budget=None,
+        result_cache=None, low_memory=None, profile_memory=None, float32_features=None,
+    ):
         self.model_type = model_type
         self.scaler = StandardScaler()
         self.label_encoders = {}
+        # Cached per-request state so finalization does not redo preprocessing
+        self.keep_fitted = keep_fitted
+        self.fitted_models = {}
+        self.prepared = {}
+        self.example_row = None
+        self.stage_timings = {}
+        # float32 matrix, scaled in place (copy=False) instead of float64 copies
+        self.low_memory = TRAIN_LOW_MEMORY if low_memory is None else bool(low_memory)
+        # Opt-in (on by default for low_memory): per-stage traced allocations (process-wide)
+        # and, for benchmark fits run in worker processes, each worker's own peak RSS
+        if profile_memory is None:
+            profile_memory = TRAIN_PROFILE_MEMORY or self.low_memory
+        self.stage_memory = {} if profile_memory else None
+        self.worker_memory = {}
+        self.float32_features = TRAIN_FLOAT32_FEATURES if float32_features is None else bool(float32_features)
+        n_jobs = TRAIN_N_JOBS if n_jobs is None else int(n_jobs)
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs < 0 else max(1, n_jobs)
+        timeout = TRAIN_ALGORITHM_TIMEOUT_S if algorithm_timeout is None else float(algorithm_timeout)
+        self.algorithm_timeout = timeout if timeout > 0 else None
+        # Optional hooks: progress_callback(name, status, result) after each algorithm,
+        # cancel_event (threading.Event) polled while benchmark fits run in worker processes
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        self.selection = selection or TRAIN_SELECTION_MODE
+        if self.selection not in SELECTION_MODES:
+            raise ValueError(f"selection must be one of {', '.join(SELECTION_MODES)}")
+        budget = TRAIN_TIME_BUDGET_S if time_budget is None else float(time_budget)
+        self.time_budget = budget if budget > 0 else None
+        self.selection_rounds = []
+        self.budget_exhausted = False
+        # Optional TrainingResultCache; fitted estimators are kept when it stores them
+        self.result_cache = result_cache if result_cache is not None and result_cache.enabled else None
+        if self.result_cache is not None and self.result_cache.store_models:
+            self.keep_fitted = True
+        self.dataset_key = None
+        self.cache_report = None
+
+    def check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise TrainingCancelled('Training cancelled')
+
+    def _record_outcome(self, outcomes, name, outcome, report=True):
+        outcomes[name] = outcome
+        # intermediate halving rounds only report algorithms that drop out
+        if self.progress_callback is not None and (report or outcome[0] != 'ok'):
+            status, payload = outcome
+            try:
+                self.progress_callback(name, status, payload[0] if status == 'ok' else None)
+            except Exception as e:
+                print('training progress callback failed:', str(e))
         
     def get_algorithms(self):
         if self.model_type == 'classification':
@@ -473,23 +2374,46 @@ class MLModelTrainer:
     def preprocess_data(self, df, input_features, output_feature):
         # Handle missing values
         df = df.dropna()
+        self.example_row = df.iloc[0] if not df.empty else None
         
-        # Separate features and target
-        X = df[input_features].copy()
-        y = df[output_feature].copy()
-        
-        # Encode categorical features
-        for col in X.columns:
-            if X[col].dtype == 'object':
-                self.label_encoders[col] = LabelEncoder()
-                X[col] = self.label_encoders[col].fit_transform(X[col])
+        # Build the feature matrix in one pass: categorical columns become their category
+        # codes (int8/int16), integer columns are downcast losslessly, float columns
+        # become float32 (unless float32_features is off)
+        X = pd.DataFrame({col: self.encode_feature(col, df[col]) for col in input_features}, index=df.index)
+        y = df[output_feature]
         
         # Encode target for classification
-        if self.model_type == 'classification' and y.dtype == 'object':
-            self.label_encoders['target'] = LabelEncoder()
-            y = self.label_encoders['target'].fit_transform(y)
+        if self.model_type == 'classification' and is_text_dtype(y.dtype):
+            y = self.category_codes('target', y)
         
         return X, y
+
+    def category_codes(self, key, series):
+        """Codes of `series` as a pandas categorical, with its mapping kept as a fitted LabelEncoder.
+
+        Categories are sorted like LabelEncoder sorts its classes, so the codes, the
+        stored encoders and the serving preprocessor (compile_preprocessor) are the
+        same as with LabelEncoder.fit_transform, without its per-column object sort
+        and int64 output.
+        """
+        categorical = pd.Categorical(series)
+        encoder = LabelEncoder()
+        encoder.classes_ = np.asarray(categorical.categories, dtype=object)
+        self.label_encoders[key] = encoder
+        return categorical.codes
+
+    def encode_feature(self, col, series):
+        if is_text_dtype(series.dtype):
+            return self.category_codes(col, series)
+        if pd.api.types.is_integer_dtype(series.dtype):
+            return pd.to_numeric(series, downcast='integer').to_numpy()
+        if self.float32_features and pd.api.types.is_float_dtype(series.dtype):
+            values = series.to_numpy()
+            # values beyond float32's range would become inf: keep those columns as they are
+            if values.dtype == np.float32 or np.abs(values).max(initial=0) <= np.finfo(np.float32).max:
+                return values.astype(np.float32, copy=False)
+            return values
+        return series.to_numpy()
     
     def evaluate_classification(self, y_true, y_pred):
         return {
@@ -517,66 +2441,410 @@ class MLModelTrainer:
             'r2_score': r2_score(y_true, y_pred)
         }
     
-    def train_and_evaluate(self, df, input_features, output_feature):
-        X, y = self.preprocess_data(df, input_features, output_feature)
+    def evaluate_algorithm(self, name, model, X_train, X_test, y_train, y_test):
+        """Fit one algorithm on the training split and score it on the test split."""
+        fit_start = time.perf_counter()
+        # Train model
+        model.fit(X_train, y_train)
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Predict
+        y_pred = model.predict(X_test)
         
-        algorithms = self.get_algorithms()
-        results = []
+        # Evaluate
+        if self.model_type == 'classification':
+            metrics = self.evaluate_classification(y_test, y_pred)
+            score = self.compute_classification_score(metrics)
+            metrics['composite_score'] = score
+        else:
+            metrics = self.evaluate_regression(y_test, y_pred)
+            score = metrics['r2_score']  # Primary metric for regression
         
+        return {
+            'algorithm': name,
+            'metrics': metrics,
+            'score': score,
+            'status': 'ok',
+            'train_time_s': round(time.perf_counter() - fit_start, 4),
+        }
+
+    def run_algorithms_parallel(self, algorithms, X_train, X_test, y_train, y_test, report=True):
+        """Fit algorithms in worker processes, at most n_jobs at a time.
+
+        The split is written once as .npy files that every worker memory-maps, so
+        the arrays are shared through the page cache instead of being pickled per
+        task. A worker exceeding algorithm_timeout is killed and reported as a
+        timeout. Returns {name: (status, payload)}.
+        """
+        ctx = multiprocessing.get_context(TRAIN_MP_START_METHOD or None)
+        outcomes = {}
+        with tempfile.TemporaryDirectory(prefix='mlops_train_') as data_dir:
+            for key, arr in (('X_train', X_train), ('X_test', X_test), ('y_train', y_train), ('y_test', y_test)):
+                np.save(os.path.join(data_dir, f'{key}.npy'), np.asarray(arr), allow_pickle=True)
+            pending = list(algorithms.items())
+            running = {}
+            while pending or running:
+                while pending and len(running) < self.n_jobs:
+                    name, model = pending.pop(0)
+                    recv_conn, send_conn = ctx.Pipe(duplex=False)
+                    proc = ctx.Process(
+                        target=_evaluate_algorithm_worker,
+                        args=(send_conn, self.model_type, name, model, data_dir, self.keep_fitted,
+                              self.stage_memory is not None),
+                        daemon=True,
+                    )
+                    proc.start()
+                    send_conn.close()
+                    deadline = time.monotonic() + self.algorithm_timeout if self.algorithm_timeout else None
+                    running[recv_conn] = (name, proc, deadline)
+                deadlines = [d for _, _, d in running.values() if d is not None]
+                wait_timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                if self.cancel_event is not None:
+                    # poll so a cancellation is noticed while long fits are running
+                    wait_timeout = 0.5 if wait_timeout is None else min(wait_timeout, 0.5)
+                for conn in mp_connection.wait(list(running), timeout=wait_timeout):
+                    name, proc, _ = running.pop(conn)
+                    try:
+                        outcome = conn.recv()
+                    except EOFError:
+                        proc.join()
+                        outcome = ('error', f'worker exited with code {proc.exitcode}')
+                    if len(outcome) == 3:
+                        outcome, worker_memory = outcome[:2], outcome[2]
+                        if worker_memory is not None:
+                            self.worker_memory[name] = worker_memory
+                    conn.close()
+                    proc.join()
+                    self._record_outcome(outcomes, name, outcome, report)
+                now = time.monotonic()
+                for conn, (name, proc, deadline) in list(running.items()):
+                    if deadline is not None and now >= deadline:
+                        proc.kill()
+                        proc.join()
+                        conn.close()
+                        del running[conn]
+                        self._record_outcome(outcomes, name, ('timeout', None), report)
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    for conn, (_, proc, _) in running.items():
+                        proc.kill()
+                        proc.join()
+                        conn.close()
+                    running.clear()
+                    self.check_cancelled()
+        return outcomes
+
+    def run_algorithms(self, algorithms, X_train, X_test, y_train, y_test, report=True):
+        """Fit and score `algorithms` on one split, in worker processes when configured.
+
+        Cancellable runs (cancel_event set, i.e. training jobs) always use worker
+        processes, even with n_jobs=1, so a cancel or time limit kills a fit in
+        progress instead of waiting for it to finish.
+        """
+        if self.n_jobs > 1 or self.algorithm_timeout or self.cancel_event is not None:
+            return self.run_algorithms_parallel(algorithms, X_train, X_test, y_train, y_test, report)
+        outcomes = {}
         for name, model in algorithms.items():
+            self.check_cancelled()
             try:
-                # Train model
-                model.fit(X_train_scaled, y_train)
-                
-                # Predict
-                y_pred = model.predict(X_test_scaled)
-                
-                # Evaluate
-                if self.model_type == 'classification':
-                    metrics = self.evaluate_classification(y_test, y_pred)
-                    score = self.compute_classification_score(metrics)
-                    metrics['composite_score'] = score
+                outcome = ('ok', (self.evaluate_algorithm(
+                    name, model, X_train, X_test, y_train, y_test
+                ), model if self.keep_fitted else None))
+            except Exception as e:
+                outcome = ('error', str(e))
+            self._record_outcome(outcomes, name, outcome, report)
+        return outcomes
+
+    def run_algorithms_cached(self, algorithms, X, y, input_features, output_feature, X_train, X_test, y_train, y_test):
+        """run_algorithms() that serves algorithms already benchmarked on this dataset from
+        the result cache and only trains the others."""
+        cache = self.result_cache
+        self.dataset_key = cache.dataset_key(X, y, input_features, output_feature, self.model_type, self.label_encoders)
+        outcomes = {}
+        misses = {}
+        for name, model in algorithms.items():
+            entry = cache.get(self.dataset_key, cache.algorithm_key(name, model))
+            if entry is None:
+                misses[name] = model
+            else:
+                self._record_outcome(outcomes, name, ('ok', (dict(entry['result'], cached=True), entry.get('model'))))
+        if misses:
+            outcomes.update(self.run_algorithms(misses, X_train, X_test, y_train, y_test))
+        for name in misses:
+            status, payload = outcomes.get(name, ('error', 'not run'))
+            if status == 'ok':
+                result, fitted = payload
+                cache.put(self.dataset_key, cache.algorithm_key(name, algorithms[name]), {
+                    'result': result,
+                    'model': fitted if cache.store_models else None,
+                })
+        self.cache_report = {
+            'dataset_key': self.dataset_key,
+            'hits': [name for name in algorithms if name not in misses],
+            'misses': list(misses),
+            'final_model_hit': False,
+        }
+        return outcomes
+
+    def halving_sizes(self, n_train):
+        """Training-sample sizes of the successive-halving rounds, ending with the full split."""
+        sizes = []
+        size = HALVING_MIN_SAMPLES
+        while size < n_train:
+            sizes.append(size)
+            size *= max(2, HALVING_FACTOR)
+        sizes.append(n_train)
+        return sizes
+
+    def subsample(self, X_train, y_train, size):
+        """Stratified (classification) random subsample of the training split."""
+        stratify = y_train if self.model_type == 'classification' else None
+        try:
+            idx, _ = train_test_split(np.arange(len(y_train)), train_size=size, stratify=stratify, random_state=42)
+        except ValueError:
+            # too few samples per class for stratification
+            idx, _ = train_test_split(np.arange(len(y_train)), train_size=size, random_state=42)
+        return np.asarray(X_train)[idx], np.asarray(y_train)[idx]
+
+    def successive_halving(self, algorithms, X_train, X_test, y_train, y_test):
+        """Score candidates on growing subsamples and drop the weak or slow ones each round.
+
+        Each round keeps the best 1/HALVING_FACTOR of the candidates; survivors whose
+        projected fit time for the next round does not fit in the remaining time budget
+        are dropped too (the best candidate always survives). Only the survivors are
+        fitted on the full training split. The budget is wall-clock: once it is spent,
+        no further round starts, including the full-split one, and the survivors keep
+        their scores from the last completed round (budget_exhausted is set) but not
+        their subsample estimators, so finalize_model() falls back to 'full'. The
+        best model's refit in finalize_model() is outside the budget. Returns
+        (outcomes of the last round, {name: result of a pruned candidate}).
+        """
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        sizes = self.halving_sizes(len(y_train))
+        candidates = list(algorithms)
+        fit_times: Dict[str, List] = defaultdict(list)
+        pruned = {}
+        failed = {}
+        last_round = None
+
+        def out_of_time():
+            return deadline is not None and last_round is not None and time.monotonic() >= deadline
+
+        def finish_early():
+            # report the survivors with their last-round results (intermediate rounds are not reported);
+            # their estimators were fitted on a subsample, so finalize_model() must refit on the full data
+            self.budget_exhausted = True
+            outcomes = {}
+            for name in candidates:
+                status, (result, _subsample_fit) = last_round[name]
+                self._record_outcome(outcomes, name, (status, (result, None)))
+            outcomes.update(failed)
+            return outcomes, pruned
+
+        def drop(result, size, reason):
+            result = dict(result, score=None, status='pruned', pruned_at_samples=size, pruned_reason=reason)
+            pruned[result['algorithm']] = result
+            if self.progress_callback is not None:
+                try:
+                    self.progress_callback(result['algorithm'], 'pruned', result)
+                except Exception as e:
+                    print('training progress callback failed:', str(e))
+
+        for round_index, size in enumerate(sizes[:-1]):
+            self.check_cancelled()
+            if out_of_time():
+                return finish_early()
+            X_sub, y_sub = self.subsample(X_train, y_train, size)
+            round_algorithms = {name: self.get_algorithms()[name] for name in candidates}
+            outcomes = self.run_algorithms(round_algorithms, X_sub, X_test, y_sub, y_test, report=False)
+            ranked = []
+            for name in candidates:
+                status, payload = outcomes.get(name, ('error', 'not run'))
+                if status == 'ok':
+                    ranked.append(payload[0])
+                    fit_times[name].append((size, payload[0]['train_time_s']))
                 else:
-                    metrics = self.evaluate_regression(y_test, y_pred)
-                    score = metrics['r2_score']  # Primary metric for regression
-                
+                    # timeouts and errors drop out exactly as in a full run
+                    failed[name] = (status, payload)
+            ranked.sort(key=lambda r: r['score'], reverse=True)
+            self.selection_rounds.append({'samples': size, 'candidates': len(candidates)})
+            if not ranked:
+                return failed, pruned
+            keep = max(1, int(np.ceil(len(ranked) / max(2, HALVING_FACTOR))))
+            for result in ranked[keep:]:
+                drop(result, size, 'score')
+            survivors = ranked[:keep]
+            if deadline is not None:
+                next_size = sizes[round_index + 1]
+                remaining = deadline - time.monotonic()
+                projected = 0.0
+                for position, result in enumerate(survivors):
+                    history = fit_times[result['algorithm']]
+                    # growth exponent from the last two rounds (1 = linear), clamped to [1, 2]
+                    exponent = 1.0
+                    if len(history) >= 2 and history[-2][1] > 0:
+                        (s0, t0), (s1, t1) = history[-2:]
+                        exponent = min(2.0, max(1.0, np.log(max(t1, 1e-6) / t0) / np.log(s1 / s0)))
+                    cost = history[-1][1] * (next_size / size) ** exponent / self.n_jobs
+                    if position > 0 and projected + cost > remaining:
+                        drop(result, size, 'time_budget')
+                        continue
+                    projected += cost
+                survivors = [r for r in survivors if r['algorithm'] not in pruned]
+            candidates = [r['algorithm'] for r in survivors]
+            last_round = outcomes
+            if len(candidates) == 1:
+                break
+
+        self.check_cancelled()
+        if out_of_time():
+            return finish_early()
+        final_algorithms = {name: self.get_algorithms()[name] for name in candidates}
+        self.selection_rounds.append({'samples': sizes[-1], 'candidates': len(candidates)})
+        outcomes = self.run_algorithms(final_algorithms, X_train, X_test, y_train, y_test)
+        outcomes.update(failed)
+        return outcomes, pruned
+
+    def train_and_evaluate(self, df, input_features, output_feature):
+        with timed_stage(self.stage_timings, 'preprocess', self.stage_memory):
+            X, y = self.preprocess_data(df, input_features, output_feature)
+        
+        with timed_stage(self.stage_timings, 'split_scale', self.stage_memory):
+            X_values = X
+            if self.low_memory:
+                # a single float32 matrix; the split copies are then scaled in place
+                X_values = X.to_numpy(dtype=np.float32)
+                self.scaler = StandardScaler(copy=False)
+            # Split data
+            X_train, X_test, y_train, y_test = train_test_split(
+                X_values, y, test_size=0.2, random_state=42
+            )
+            
+            # Scale features
+            X_train_scaled = self.scaler.fit_transform(X_train)
+            X_test_scaled = self.scaler.transform(X_test)
+            # the stored scaler must not modify its caller's arrays later on
+            self.scaler.set_params(copy=True)
+        self.prepared = {'X': X_values, 'y': y, 'X_train_scaled': X_train_scaled, 'y_train': y_train}
+        
+        algorithms = self.get_algorithms()
+        results = []
+
+        pruned = {}
+        with timed_stage(self.stage_timings, 'benchmark', self.stage_memory):
+            if self.selection == 'halving':
+                outcomes, pruned = self.successive_halving(algorithms, X_train_scaled, X_test_scaled, y_train, y_test)
+            elif self.result_cache is not None:
+                outcomes = self.run_algorithms_cached(
+                    algorithms, X, y, input_features, output_feature,
+                    X_train_scaled, X_test_scaled, y_train, y_test,
+                )
+            else:
+                outcomes = self.run_algorithms(algorithms, X_train_scaled, X_test_scaled, y_train, y_test)
+        if self.stage_memory is not None and self.worker_memory:
+            self.stage_memory['benchmark']['workers'] = dict(self.worker_memory)
+
+        # Collect in get_algorithms() order so the parallel path ranks exactly like the sequential one
+        for name in algorithms:
+            if name in pruned:
+                results.append(pruned[name])
+                continue
+            status, payload = outcomes.get(name, ('error', 'not run'))
+            if status == 'ok':
+                result, fitted = payload
+                results.append(result)
+                if fitted is not None:
+                    self.fitted_models[name] = fitted
+            elif status == 'timeout':
+                print(f"Timeout with {name} after {self.algorithm_timeout}s")
                 results.append({
                     'algorithm': name,
-                    'metrics': metrics,
-                    'score': score
+                    'metrics': {},
+                    'score': None,
+                    'status': 'timeout',
+                    'train_time_s': self.algorithm_timeout,
                 })
-            except Exception as e:
-                print(f"Error with {name}: {str(e)}")
-                continue
+            else:
+                print(f"Error with {name}: {payload}")
+        scored = [r for r in results if r.get('score') is not None]
         # If no algorithm produced results, raise a clear error so caller can handle it
-        if len(results) == 0:
+        if len(scored) == 0:
             raise ValueError(
                 "No algorithms could be trained successfully. Check your dataset for sufficient rows, correct column types, and that the selected input/output columns exist and contain valid values."
             )
 
-        # Sort by score and select best
-        results.sort(key=lambda x: x['score'], reverse=True)
-        best_model = results[0]
+        # Sort by score and select best (timed-out and pruned algorithms last)
+        results.sort(key=lambda x: x['score'] if x.get('score') is not None else float('-inf'), reverse=True)
+        scored = [r for r in results if r.get('score') is not None]
+        best_model = scored[0]
         
         # Generate justification
-        justification = self.generate_justification(best_model, results, self.model_type)
+        justification = self.generate_justification(
+            best_model, scored, self.model_type, pruned=[r for r in results if r.get('status') == 'pruned']
+        )
         
         return {
             'results': results,
             'best_model': best_model['algorithm'],
-            'justification': justification
+            'justification': justification,
+            'selection': {
+                'mode': self.selection,
+                'time_budget_s': self.time_budget,
+                'rounds': self.selection_rounds,
+                'budget_exhausted': self.budget_exhausted,
+            },
+            'cache': self.cache_report,
         }
     
-    def generate_justification(self, best_model, all_results, model_type):
+    def finalize_model(self, name, policy='full'):
+        """Return (estimator, scaler, policy_used) to persist for algorithm `name`.
+
+        Reuses the preprocessing cached by train_and_evaluate:
+        - 'holdout': keep the estimator already fitted on the training split;
+        - 'warm_start': continue from that estimator on the full data, for estimators
+          whose warm_start reuses the previous solution (ensembles would grow instead);
+        - 'full': fit a fresh estimator and scaler on the full data.
+        Falls back to 'full' when the fitted estimator is unavailable or unsuitable.
+        """
+        final_key = None
+        if self.result_cache is not None and self.result_cache.store_models and self.dataset_key:
+            final_key = f"final-{policy}-{self.result_cache.algorithm_key(name, self.get_algorithms()[name])}"
+            entry = self.result_cache.get(self.dataset_key, final_key)
+            if entry is not None:
+                if self.cache_report is not None:
+                    self.cache_report['final_model_hit'] = True
+                return entry['model'], entry['scaler'], entry['policy']
+        finalized = self._finalize_model(name, policy)
+        if final_key is not None:
+            self.result_cache.put(self.dataset_key, final_key, dict(zip(('model', 'scaler', 'policy'), finalized)))
+        return finalized
+
+    def _finalize_model(self, name, policy):
+        fitted = self.fitted_models.get(name)
+        if policy == 'holdout' and fitted is not None:
+            return fitted, self.scaler, 'holdout'
+        X, y = self.prepared['X'], self.prepared['y']
+        if (
+            policy == 'warm_start'
+            and fitted is not None
+            and 'warm_start' in fitted.get_params()
+            and not isinstance(fitted, BaseEnsemble)
+        ):
+            # Keep the training-split scaler so the warm-started solution stays valid
+            fitted.set_params(warm_start=True)
+            fitted.fit(self.scaler.transform(X), y)
+            return fitted, self.scaler, 'warm_start'
+        estimator = self.get_algorithms()[name]
+        if self.low_memory:
+            # last use of the prepared matrix: scale it in place
+            scaler = StandardScaler(copy=False)
+            X_scaled = scaler.fit_transform(X)
+            scaler.set_params(copy=True)
+        else:
+            scaler = StandardScaler()
+            X_scaled = scaler.fit_transform(X)
+        estimator.fit(X_scaled, y)
+        return estimator, scaler, 'full'
+
+    def generate_justification(self, best_model, all_results, model_type, pruned=None):
         algorithm = best_model['algorithm']
         metrics = best_model['metrics']
         score_value = float(best_model.get('score', 0.0))
@@ -622,6 +2890,17 @@ class MLModelTrainer:
                     justification_parts.append(
                         f"Avantage supplémentaire : accuracy +{acc_val - sb_acc:.4f} et F1 +{f1_val - sb_f1:.4f}, confirmant une meilleure stabilité."
                     )
+
+        # Candidats écartés par la sélection par élimination successive
+        if pruned:
+            reasons = {'score': 'score insuffisant', 'time_budget': 'budget de temps'}
+            details = ", ".join(
+                f"{r['algorithm']} ({r['pruned_at_samples']} échantillons, {reasons.get(r.get('pruned_reason'), r.get('pruned_reason'))})"
+                for r in pruned
+            )
+            justification_parts.append(
+                f"Sélection par élimination successive : candidats écartés sur sous-échantillons avant l'entraînement complet : {details}."
+            )
         return " ".join(justification_parts)
 
 def generate_report_file(
@@ -632,7 +2911,11 @@ def generate_report_file(
     output_feature: str,
     results: List[Dict[str, Any]],
     justification: str,
-    models_dir: str
+    models_dir: str,
+    stage_timings: Optional[Dict[str, float]] = None,
+    finalize_policy: Optional[str] = None,
+    stage_memory: Optional[Dict[str, Any]] = None,
+    low_memory: bool = False,
 ) -> str:
     """Crée un rapport texte résumant l'entraînement et renvoie le nom de fichier."""
     timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
@@ -652,6 +2935,10 @@ def generate_report_file(
     lines.append("Résultats par algorithme :")
     for res in results:
         lines.append(f"- {res['algorithm']}")
+        if res.get('status') == 'timeout':
+            lines.append(f"    statut : délai dépassé ({res.get('train_time_s')} s)")
+        elif res.get('status') == 'pruned':
+            lines.append(f"    statut : écarté à {res.get('pruned_at_samples')} échantillons ({res.get('pruned_reason')})")
         metrics = res.get('metrics', {})
         for k, v in metrics.items():
             try:
@@ -662,6 +2949,20 @@ def generate_report_file(
     lines.append("")
     lines.append("Meilleur modèle :")
     lines.append(f"{justification}")
+    if finalize_policy:
+        lines.append(f"Finalisation : {finalize_policy}")
+    if stage_timings:
+        lines.append("")
+        lines.append("Durée des étapes (s) :")
+        for stage, seconds in stage_timings.items():
+            lines.append(f"    {stage}: {seconds:.4f}")
+    if stage_memory:
+        lines.append("")
+        lines.append(f"Mémoire par étape (Mo, allocations tracées du processus entier){' - mode mémoire réduite float32' if low_memory else ''} :")
+        for stage, mem in stage_memory.items():
+            lines.append(f"    {stage}: pic +{mem['process_peak_mb']:.1f} (reste +{mem['process_delta_mb']:.1f})")
+            for algorithm, worker in (mem.get('workers') or {}).items():
+                lines.append(f"        {algorithm} (processus dédié): pic RSS {worker['peak_rss_mb']:.1f} (+{worker['delta_mb']:.1f})")
 
     os.makedirs(models_dir, exist_ok=True)
     with open(filepath, "w", encoding="utf-8") as f:
@@ -669,89 +2970,129 @@ def generate_report_file(
 
     return filename
 
-@app.route('/api/train', methods=['POST'])
-def train_model():
-    try:
-        # Get request data
-        data = request.json
-        model_name = data.get('model_name')
-        description = data.get('description')
-        model_type = data.get('model_type')  # 'classification' or 'regression'
-        csv_data = data.get('csv_data')
-        input_features = data.get('input_features')
-        output_feature = data.get('output_feature')
-        example_payload = None
-        
+def run_training(data: Dict[str, Any], progress_callback=None, cancel_event=None) -> Dict[str, Any]:
+    """Run the whole /api/train pipeline for a request body and return the response payload.
+
+    Raises on invalid input or training failure. progress_callback/cancel_event are
+    forwarded to MLModelTrainer (used by training jobs).
+    """
+    model_name = data.get('model_name')
+    description = data.get('description')
+    model_type = data.get('model_type')  # 'classification' or 'regression'
+    csv_data = data.get('csv_data')
+    dataset_id = data.get('dataset_id')
+    input_features = data.get('input_features')
+    output_feature = data.get('output_feature')
+    example_payload = None
+    stage_timings: Dict[str, float] = {}
+    low_memory = TRAIN_LOW_MEMORY if data.get('low_memory') is None else bool(data.get('low_memory'))
+    if data.get('profile_memory') is None:
+        profile_memory = TRAIN_PROFILE_MEMORY or low_memory
+    else:
+        profile_memory = bool(data.get('profile_memory'))
+    stage_memory: Optional[Dict[str, Any]] = {} if profile_memory else None
+    finalize_policy = data.get('finalize_policy') or TRAIN_FINALIZE_POLICY
+    if finalize_policy not in FINALIZE_POLICIES:
+        raise ValueError(f"finalize_policy must be one of {', '.join(FINALIZE_POLICIES)}")
+    
+    if dataset_id:
+        # Stored dataset: load only the columns used for training
+        with timed_stage(stage_timings, 'load_dataset', stage_memory):
+            df = load_dataset(dataset_id, columns=list(dict.fromkeys(list(input_features or []) + [output_feature])))
+            if low_memory:
+                df = downcast_numeric(df, exclude=[output_feature])
+    else:
         # Parse CSV data (try robustly to handle semicolons or commas)
-        try:
-            df = robust_read_csv(csv_data)
-        except Exception as e:
-            return jsonify({'success': False, 'error': str(e)}), 400
-        
-        # Build example payload from first row (non-null) if possible
-        try:
-            if not df.empty:
-                first_valid = df.dropna().iloc[0]
-                example_payload = {}
-                for feat in input_features or []:
-                    if feat in first_valid:
-                        val = first_valid[feat]
-                        if hasattr(val, "item"):
-                            val = val.item()
-                        example_payload[feat] = val
-        except Exception as e:
-            print("example payload build failed:", str(e))
-        
-        # Initialize trainer
-        trainer = MLModelTrainer(model_type)
+        with timed_stage(stage_timings, 'parse_csv', stage_memory):
+            df = robust_read_csv(
+                csv_data,
+                usecols=list(input_features or []) + [output_feature] if input_features and output_feature else None,
+                dtype=data.get('dtype_hints'),
+            )
+            if low_memory:
+                df = downcast_numeric(df, exclude=[output_feature])
+    
+    # Initialize trainer
+    trainer = MLModelTrainer(
+        model_type,
+        n_jobs=data.get('n_jobs'),
+        algorithm_timeout=data.get('algorithm_timeout'),
+        keep_fitted=finalize_policy != 'full',
+        progress_callback=progress_callback,
+        cancel_event=cancel_event,
+        selection=data.get('selection') or ('halving' if data.get('time_budget') else None),
+        time_budget=data.get('time_budget'),
+        result_cache=training_result_cache if data.get('use_cache', True) else None,
+        low_memory=low_memory,
+        profile_memory=profile_memory,
+        float32_features=data.get('float32_features'),
+    )
 
-        # Train and evaluate
-        results = trainer.train_and_evaluate(df, input_features, output_feature)
+    # Train and evaluate
+    results = trainer.train_and_evaluate(df, input_features, output_feature)
+    stage_timings.update(trainer.stage_timings)
+    if stage_memory is not None:
+        stage_memory.update(trainer.stage_memory)
+    trainer.check_cancelled()
 
-        # Réentraîner le meilleur modèle sur l'ensemble du jeu de données et le sauvegarder
-        best_algorithm_name = results['best_model']
-        algorithms = trainer.get_algorithms()
-        best_estimator = algorithms.get(best_algorithm_name)
-        model_file = None
-        report_file = None
-        models_dir = os.path.join(os.path.dirname(__file__), 'models')
-        primary_metric_value = None
-        best_metrics_blob = None
-        if best_estimator is not None:
-            # Preprocess full data and scale
-            X_full, y_full = trainer.preprocess_data(df, input_features, output_feature)
-            X_full_scaled = trainer.scaler.fit_transform(X_full)
+    # Build example payload from first row (non-null) kept by preprocessing
+    try:
+        first_valid = trainer.example_row
+        if first_valid is not None:
+            example_payload = {}
+            for feat in input_features or []:
+                if feat in first_valid:
+                    val = first_valid[feat]
+                    if hasattr(val, "item"):
+                        val = val.item()
+                    example_payload[feat] = val
+    except Exception as e:
+        print("example payload build failed:", str(e))
+
+    # Finaliser le meilleur modèle (réutilise le prétraitement déjà fait) et le sauvegarder
+    best_algorithm_name = results['best_model']
+    model_file = None
+    report_file = None
+    models_dir = os.path.join(os.path.dirname(__file__), 'models')
+    primary_metric_value = None
+    best_metrics_blob = None
+    policy_used = None
+    try:
+        with timed_stage(stage_timings, 'finalize', stage_memory):
+            best_estimator, scaler, policy_used = trainer.finalize_model(best_algorithm_name, finalize_policy)
+        with timed_stage(stage_timings, 'save_artifact', stage_memory):
+            artifact = {
+                'model': best_estimator,
+                'scaler': scaler,
+                'label_encoders': trainer.label_encoders,
+                'input_features': input_features,
+                'output_feature': output_feature,
+                'model_type': model_type,
+                'preprocessor': compile_preprocessor(input_features, trainer.label_encoders, scaler),
+            }
+            # capture primary metric for stats
+            primary_metric_value = results['results'][0].get('score')
             try:
-                best_estimator.fit(X_full_scaled, y_full)
-                artifact = {
-                    'model': best_estimator,
-                    'scaler': trainer.scaler,
-                    'label_encoders': trainer.label_encoders,
-                    'input_features': input_features,
-                    'output_feature': output_feature,
-                    'model_type': model_type,
-                }
-                # capture primary metric for stats
-                primary_metric_value = results['results'][0].get('score')
-                try:
-                    best_metrics_blob = json.dumps({
-                        'metrics': results['results'][0].get('metrics', {}),
-                        'example_payload': example_payload
-                    })
-                except Exception:
-                    best_metrics_blob = None
-                os.makedirs(models_dir, exist_ok=True)
-                safe_model_name = (model_name or 'model').replace(' ', '_')
-                filename = f"{safe_model_name}.pkl"
-                filepath = os.path.join(models_dir, filename)
-                joblib.dump(artifact, filepath)
-                model_file = filename
-            except Exception as e:
-                print('Error saving model:', str(e))
-                model_file = None
+                best_metrics_blob = json.dumps({
+                    'metrics': results['results'][0].get('metrics', {}),
+                    'example_payload': example_payload
+                })
+            except Exception:
+                best_metrics_blob = None
+            os.makedirs(models_dir, exist_ok=True)
+            safe_model_name = (model_name or 'model').replace(' ', '_')
+            filename = f"{safe_model_name}.pkl"
+            filepath = os.path.join(models_dir, filename)
+            joblib.dump(artifact, filepath)
+            artifact_cache.invalidate(filepath)
+            model_file = filename
+    except Exception as e:
+        print('Error saving model:', str(e))
+        model_file = None
 
-        # GǸnǸrer un rapport texte
-        try:
+    # GǸnǸrer un rapport texte
+    try:
+        with timed_stage(stage_timings, 'report'):
             report_file = generate_report_file(
                 model_name=model_name,
                 description=description,
@@ -760,42 +3101,58 @@ def train_model():
                 output_feature=output_feature,
                 results=results['results'],
                 justification=results['justification'],
-                models_dir=models_dir
+                models_dir=models_dir,
+                stage_timings=stage_timings,
+                finalize_policy=policy_used,
+                stage_memory=stage_memory,
+                low_memory=low_memory,
             )
-        except Exception as e:
-            print('Error generating report:', str(e))
-            report_file = None
+    except Exception as e:
+        print('Error generating report:', str(e))
+        report_file = None
 
-        # Sauvegarder les métadonnées en base MySQL (best-effort)
-        try:
-            insert_model_metadata(
-                model_name=model_name or '',
-                description=description or '',
-                model_type=model_type or '',
-                input_features=input_features or [],
-                output_feature=output_feature or '',
-                best_algorithm=results['best_model'],
-                justification=results['justification'],
-                model_file=model_file,
-                report_file=report_file,
-                metric_primary=primary_metric_value,
-                metrics_json=best_metrics_blob
-            )
-        except Exception as e:
-            print('MySQL metadata insert error:', str(e))
+    # Sauvegarder les métadonnées en base MySQL (best-effort)
+    metadata_start = time.perf_counter()
+    try:
+        insert_model_metadata(
+            model_name=model_name or '',
+            description=description or '',
+            model_type=model_type or '',
+            input_features=input_features or [],
+            output_feature=output_feature or '',
+            best_algorithm=results['best_model'],
+            justification=results['justification'],
+            model_file=model_file,
+            report_file=report_file,
+            metric_primary=primary_metric_value,
+            metrics_json=best_metrics_blob
+        )
+    except Exception as e:
+        print('MySQL metadata insert error:', str(e))
+    stage_timings['metadata'] = round(time.perf_counter() - metadata_start, 4)
 
-        return jsonify({
-            'success': True,
-            'model_name': model_name,
-            'description': description,
-            'model_type': model_type,
-            'results': results['results'],
-            'best_model': results['best_model'],
-            'justification': results['justification'],
-            'model_file': model_file,
-            'report_file': report_file
-        })
-    
+    return {
+        'success': True,
+        'model_name': model_name,
+        'description': description,
+        'model_type': model_type,
+        'results': results['results'],
+        'best_model': results['best_model'],
+        'justification': results['justification'],
+        'model_file': model_file,
+        'report_file': report_file,
+        'finalize_policy': policy_used,
+        'selection': results['selection'],
+        'cache': results['cache'],
+        'timings': stage_timings,
+        'low_memory': low_memory,
+        'memory': stage_memory,
+    }
+
+@app.route('/api/train', methods=['POST'])
+def train_model():
+    try:
+        return jsonify(run_training(request.json))
     except Exception as e:
         return jsonify({
             'success': False,
@@ -803,6 +3160,397 @@ def train_model():
         }), 400
 
 
+# ---- Training jobs ----
+
+TRAINING_JOB_WORKERS = int(os.environ.get("TRAINING_JOB_WORKERS", "2"))
+# Jobs allowed to wait for a worker before submissions are rejected
+TRAINING_JOB_MAX_PENDING = int(os.environ.get("TRAINING_JOB_MAX_PENDING", "20"))
+# Default wall-clock limit per job in seconds (0 = unlimited); overridable with "time_limit"
+TRAINING_JOB_TIME_LIMIT_S = float(os.environ.get("TRAINING_JOB_TIME_LIMIT_S", "0"))
+TRAINING_JOB_HEARTBEAT_S = float(os.environ.get("TRAINING_JOB_HEARTBEAT_S", "10"))
+# Finished jobs are dropped from memory after this many seconds, or oldest first beyond
+# the cap; they stay readable from training_jobs
+TRAINING_JOB_RETENTION_S = float(os.environ.get("TRAINING_JOB_RETENTION_S", "3600"))
+TRAINING_JOB_MAX_FINISHED = int(os.environ.get("TRAINING_JOB_MAX_FINISHED", "200"))
+JOB_ACTIVE_STATUSES = ('queued', 'running')
+
+class JobQueueFull(Exception):
+    pass
+
+def ensure_training_jobs_table(conn) -> bool:
+    """Create training_jobs table (state of asynchronous /api/train/jobs submissions). Returns False on failure."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS training_jobs (
+                id VARCHAR(36) PRIMARY KEY,
+                status VARCHAR(20) NOT NULL,
+                model_name VARCHAR(255),
+                model_type VARCHAR(50),
+                total_algorithms INT DEFAULT 0,
+                completed_algorithms INT DEFAULT 0,
+                results_json MEDIUMTEXT,
+                result_json MEDIUMTEXT,
+                error TEXT,
+                created_at DATETIME NULL,
+                started_at DATETIME NULL,
+                finished_at DATETIME NULL,
+                heartbeat_at DATETIME NULL,
+                INDEX idx_status (status),
+                INDEX idx_created_at (created_at)
+            );
+            """
+        )
+        cursor.close()
+        return True
+    except MySQLError as e:
+        print("MySQL training_jobs table creation failed:", str(e))
+        return False
+
+TRAINING_JOB_COLUMNS = [
+    'id', 'status', 'model_name', 'model_type', 'total_algorithms', 'completed_algorithms',
+    'results_json', 'result_json', 'error', 'created_at', 'started_at', 'finished_at', 'heartbeat_at',
+]
+
+def save_training_job(job: Dict[str, Any]):
+    """Upsert a job's state. Best-effort: the in-memory copy stays authoritative while it runs."""
+    conn = get_db_connection()
+    if conn is None:
+        return
+    row = {
+        **{col: job.get(col) for col in TRAINING_JOB_COLUMNS},
+        'results_json': json.dumps(job.get('results') or [], default=str),
+        'result_json': json.dumps(job['result'], default=str) if job.get('result') is not None else None,
+    }
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"INSERT INTO training_jobs ({', '.join(TRAINING_JOB_COLUMNS)}) VALUES ({', '.join(['%s'] * len(TRAINING_JOB_COLUMNS))}) "
+            "ON DUPLICATE KEY UPDATE " + ", ".join(f"{col} = VALUES({col})" for col in TRAINING_JOB_COLUMNS[1:]),
+            [row[col] for col in TRAINING_JOB_COLUMNS],
+        )
+        cursor.close()
+    except MySQLError as e:
+        print("MySQL save training job failed:", str(e))
+    finally:
+        conn.close()
+
+def _job_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    job = {col: row.get(col) for col in TRAINING_JOB_COLUMNS if not col.endswith('_json')}
+    try:
+        job['results'] = json.loads(row.get('results_json') or '[]')
+        job['result'] = json.loads(row['result_json']) if row.get('result_json') else None
+    except ValueError:
+        job['results'], job['result'] = [], None
+    return job
+
+def fetch_training_jobs(job_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    conn = get_db_connection()
+    if conn is None:
+        return []
+    rows = []
+    try:
+        cursor = conn.cursor(dictionary=True)
+        if job_id is not None:
+            cursor.execute("SELECT * FROM training_jobs WHERE id = %s", (job_id,))
+        else:
+            cursor.execute("SELECT * FROM training_jobs ORDER BY created_at DESC LIMIT %s", (int(limit),))
+        rows = cursor.fetchall() or []
+        cursor.close()
+    except MySQLError as e:
+        print("MySQL fetch training jobs failed:", str(e))
+    finally:
+        conn.close()
+    return [_job_from_row(r) for r in rows]
+
+def touch_training_jobs(job_ids: List[str]):
+    if not job_ids:
+        return
+    conn = get_db_connection()
+    if conn is None:
+        return
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"UPDATE training_jobs SET heartbeat_at = %s WHERE id IN ({', '.join(['%s'] * len(job_ids))})",
+            [datetime.now()] + list(job_ids),
+        )
+        cursor.close()
+    except MySQLError as e:
+        print("MySQL training job heartbeat failed:", str(e))
+    finally:
+        conn.close()
+
+def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    def iso(value):
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+    return {
+        'job_id': job.get('id'),
+        'status': job.get('status'),
+        'model_name': job.get('model_name'),
+        'model_type': job.get('model_type'),
+        'progress': {
+            'completed': job.get('completed_algorithms') or 0,
+            'total': job.get('total_algorithms') or 0,
+        },
+        'results': job.get('results') or [],
+        'result': job.get('result'),
+        'error': job.get('error'),
+        'created_at': iso(job.get('created_at')),
+        'started_at': iso(job.get('started_at')),
+        'finished_at': iso(job.get('finished_at')),
+    }
+
+class TrainingJobManager:
+    """Runs /api/train request bodies as background jobs on a bounded thread pool.
+
+    Each job reports per-algorithm progress through MLModelTrainer's progress
+    callback, can be cancelled or time-limited through its cancel event, and is
+    persisted to training_jobs on every state change. Benchmark fits run in worker
+    processes that are killed on cancel/timeout; the final refit of the best model
+    runs in-process and the limit is only checked once it returns. Active jobs
+    heartbeat so a job orphaned by a restart is reported as 'interrupted' instead of
+    running forever. Finished jobs are evicted from memory after retention seconds
+    or beyond max_finished; get() then reads them back from training_jobs.
+    """
+    def __init__(
+        self, max_workers: int, max_pending: int, heartbeat_interval: float,
+        retention: float = TRAINING_JOB_RETENTION_S, max_finished: int = TRAINING_JOB_MAX_FINISHED,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.heartbeat_interval = heartbeat_interval
+        self.retention = retention
+        self.max_finished = max_finished
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._cond = threading.Condition()
+
+    def _ensure_started(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='training-job')
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name='training-job-heartbeat', daemon=True)
+            self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._cond:
+                active = [job_id for job_id, job in self._jobs.items() if job['status'] in JOB_ACTIVE_STATUSES]
+            touch_training_jobs(active)
+
+    def _prune(self):
+        """Evict finished jobs past retention, then the oldest beyond max_finished (caller holds _cond)."""
+        finished = sorted(
+            (job['finished_at'] or job['created_at'], job_id)
+            for job_id, job in self._jobs.items() if job['status'] not in JOB_ACTIVE_STATUSES
+        )
+        cutoff = datetime.now() - timedelta(seconds=self.retention)
+        excess = len(finished) - self.max_finished
+        for position, (finished_at, job_id) in enumerate(finished):
+            if position < excess or finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def _update(self, job: Dict[str, Any], **fields):
+        with self._cond:
+            job.update(fields)
+            job['version'] += 1
+            snapshot = dict(job, results=list(job['results']))
+            self._cond.notify_all()
+        save_training_job(snapshot)
+        if snapshot['status'] not in JOB_ACTIVE_STATUSES:
+            # after the save, so an evicted job is already readable from training_jobs
+            with self._cond:
+                self._prune()
+
+    def submit(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        model_type = data.get('model_type')
+        if model_type not in ('classification', 'regression'):
+            raise ValueError("model_type must be 'classification' or 'regression'")
+        time_limit = data.get('time_limit')
+        time_limit = TRAINING_JOB_TIME_LIMIT_S if time_limit is None else float(time_limit)
+        now = datetime.now()
+        job = {
+            'id': uuid.uuid4().hex,
+            'status': 'queued',
+            'model_name': data.get('model_name'),
+            'model_type': model_type,
+            'total_algorithms': len(MLModelTrainer(model_type).get_algorithms()),
+            'completed_algorithms': 0,
+            'results': [],
+            'result': None,
+            'error': None,
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'heartbeat_at': now,
+            'time_limit': time_limit if time_limit > 0 else None,
+            'timed_out': False,
+            'cancel_event': threading.Event(),
+            'version': 0,
+        }
+        with self._cond:
+            self._prune()
+            active = sum(1 for j in self._jobs.values() if j['status'] in JOB_ACTIVE_STATUSES)
+            if active >= self.max_workers + self.max_pending:
+                raise JobQueueFull('Too many training jobs queued, retry later')
+            self._jobs[job['id']] = job
+            self._ensure_started()
+        save_training_job(job)
+        self._executor.submit(self._run, job, data)
+        return job
+
+    def _on_progress(self, job: Dict[str, Any], name: str, status: str, result: Optional[Dict[str, Any]]):
+        entry = result if result is not None else {'algorithm': name, 'metrics': {}, 'score': None, 'status': status}
+        with self._cond:
+            job['results'].append(entry)
+        self._update(job, completed_algorithms=job['completed_algorithms'] + 1)
+
+    def _expire(self, job: Dict[str, Any]):
+        job['timed_out'] = True
+        job['cancel_event'].set()
+
+    def _run(self, job: Dict[str, Any], data: Dict[str, Any]):
+        if job['cancel_event'].is_set():
+            # cancelled while queued: cancel() already recorded it
+            return
+        self._update(job, status='running', started_at=datetime.now())
+        timer = None
+        if job['time_limit']:
+            timer = threading.Timer(job['time_limit'], self._expire, (job,))
+            timer.daemon = True
+            timer.start()
+        try:
+            payload = run_training(
+                data,
+                progress_callback=lambda name, status, result: self._on_progress(job, name, status, result),
+                cancel_event=job['cancel_event'],
+            )
+            self._update(job, status='succeeded', result=payload, finished_at=datetime.now())
+        except TrainingCancelled:
+            if job['timed_out']:
+                self._update(job, status='timeout', error=f"Time limit of {job['time_limit']}s exceeded", finished_at=datetime.now())
+            else:
+                self._update(job, status='cancelled', finished_at=datetime.now())
+        except Exception as e:
+            self._update(job, status='failed', error=str(e), finished_at=datetime.now())
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return self.get(job_id)
+        if job['status'] in JOB_ACTIVE_STATUSES:
+            job['cancel_event'].set()
+            if job['status'] == 'queued':
+                self._update(job, status='cancelled', finished_at=datetime.now())
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job state from memory, or from training_jobs for jobs run by another process."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job, results=list(job['results']))
+        rows = fetch_training_jobs(job_id)
+        if not rows:
+            return None
+        job = rows[0]
+        heartbeat = job.get('heartbeat_at')
+        stale_after = timedelta(seconds=3 * self.heartbeat_interval)
+        if job['status'] in JOB_ACTIVE_STATUSES and (heartbeat is None or datetime.now() - heartbeat > stale_after):
+            job.update(status='interrupted', error='Job interrupted (server restarted)', finished_at=datetime.now())
+            save_training_job(job)
+        return job
+
+    def wait_for_change(self, job_id: str, version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """Block until an in-memory job moves past `version` (or timeout) and return its state."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and job['version'] <= version:
+                self._cond.wait_for(lambda: job['version'] > version, timeout=timeout)
+        return self.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            counts = defaultdict(int)
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return {'workers': self.max_workers, 'max_pending': self.max_pending, **counts}
+
+training_jobs = TrainingJobManager(
+    max_workers=TRAINING_JOB_WORKERS,
+    max_pending=TRAINING_JOB_MAX_PENDING,
+    heartbeat_interval=TRAINING_JOB_HEARTBEAT_S,
+)
+
+@app.route('/api/train/jobs', methods=['POST'])
+def submit_training_job():
+    """Queue a training run (same body as /api/train, plus optional time_limit) and return its job id."""
+    try:
+        job = training_jobs.submit(request.json or {})
+    except JobQueueFull as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'job_id': job['id'],
+        'status': job['status'],
+        'status_url': f"/api/train/jobs/{job['id']}",
+    }), 202
+
+@app.route('/api/train/jobs', methods=['GET'])
+def list_training_jobs():
+    limit = max(1, min(request.args.get('limit', default=50, type=int), 200))
+    jobs = {job['id']: job for job in fetch_training_jobs(limit=limit)}
+    for job_id in list(jobs):
+        live = training_jobs.get(job_id)
+        if live is not None:
+            jobs[job_id] = live
+    return jsonify({'success': True, 'jobs': [serialize_job(j) for j in jobs.values()]})
+
+@app.route('/api/train/jobs/<job_id>', methods=['GET'])
+def training_job_status(job_id: str):
+    job = training_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, **serialize_job(job)})
+
+@app.route('/api/train/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_training_job(job_id: str):
+    job = training_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, **serialize_job(job)})
+
+@app.route('/api/train/jobs/<job_id>/events', methods=['GET'])
+def training_job_events(job_id: str):
+    """Server-sent events: one message per state change (status, progress, partial results)."""
+    job = training_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    def stream(job):
+        version = -1
+        while job is not None:
+            if job.get('version', 0) != version:
+                version = job.get('version', 0)
+                yield f"data: {json.dumps(serialize_job(job), default=str)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            if job['status'] not in JOB_ACTIVE_STATUSES or 'version' not in job:
+                return
+            job = training_jobs.wait_for_change(job_id, version, timeout=15)
+
+    return Response(stream(job), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @app.route('/api/download-model', methods=['GET'])
 def download_model():
     filename = request.args.get('filename')
@@ -827,13 +3575,29 @@ def download_report():
 
 @app.route('/api/dashboard/stats', methods=['GET'])
 def dashboard_stats():
-    models = fetch_models()
-    stats = compute_global_stats(models)
+    stats = get_dashboard_stats()
     return jsonify({'success': True, **stats})
 
 @app.route('/api/models', methods=['GET'])
 def list_models():
-    models = fetch_models()
+    """List models, newest first.
+
+    Optional query params: limit (page size, capped by MODELS_MAX_PAGE_SIZE) and
+    cursor (next_cursor of the previous page). Without limit every model is returned.
+    """
+    limit = request.args.get('limit', type=int)
+    after = request.args.get('cursor')
+    if limit is not None:
+        limit = max(1, min(limit, MODELS_MAX_PAGE_SIZE))
+    try:
+        # Fetch one extra row to know whether another page exists
+        models = fetch_models(MODEL_LIST_COLUMNS, limit=limit + 1 if limit else None, after=after)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    next_cursor = None
+    if limit and len(models) > limit:
+        models = models[:limit]
+        next_cursor = encode_models_cursor(models[-1])
     payload = []
     for m in models:
         payload.append({
@@ -846,7 +3610,7 @@ def list_models():
             'algorithm': m.get('best_algorithm'),
             'description': m.get('description'),
         })
-    return jsonify({'success': True, 'models': payload})
+    return jsonify({'success': True, 'models': payload, 'next_cursor': next_cursor})
 
 @app.route('/api/models/<int:model_id>', methods=['GET'])
 def model_details(model_id: int):
@@ -917,36 +3681,83 @@ def model_api_stats_copy(model_id: int):
         print('log copy event failed:', str(e))
     return jsonify({'success': True})
 
+def preprocess_batch(batch: Any, artifact: Dict[str, Any]) -> np.ndarray:
+    """Encode a batch given as a list of row objects or columnar arrays ({feature: [values...]}).
+
+    Missing features become nulls, extra keys are ignored.
+    """
+    preprocessor = artifact['preprocessor']
+    if isinstance(batch, list):
+        if not all(isinstance(r, dict) for r in batch):
+            raise ValueError('rows must be a list of JSON objects')
+        return encode_rows(preprocessor, batch)
+    if isinstance(batch, dict):
+        if any(not isinstance(v, list) for v in batch.values()):
+            raise ValueError('columns must map each feature to an array of values')
+        lengths = {len(v) for v in batch.values()}
+        if len(lengths) > 1:
+            raise ValueError('all column arrays must have the same length')
+        return encode_columns(preprocessor, batch, lengths.pop() if lengths else 0)
+    raise ValueError('batch must be a list of rows or an object of columns')
+
 def preprocess_payload(features: Dict[str, Any], artifact: Dict[str, Any]):
     """Apply stored encoders/scaler to a single payload."""
-    input_features = artifact.get('input_features', [])
-    label_encoders = artifact.get('label_encoders', {})
-    scaler = artifact.get('scaler')
-    # Build dataframe from payload
-    row = {feat: features.get(feat) for feat in input_features}
-    df = pd.DataFrame([row])
-    # Encode categorical same as training
-    for col, enc in label_encoders.items():
-        if col == 'target':
-            continue
-        if col in df:
-            try:
-                df[col] = enc.transform(df[col].astype(str))
-            except Exception:
-                # Handle unseen categories by mapping to closest known (fallback to first class)
-                known = set(enc.classes_)
-                df[col] = df[col].astype(str).apply(lambda v: v if v in known else list(known)[0])
-                df[col] = enc.transform(df[col])
-    X_scaled = scaler.transform(df)
-    return X_scaled
+    return encode_rows(artifact['preprocessor'], [features])
+
+def predict_with_artifact(artifact: Dict[str, Any], X_scaled) -> List[Any]:
+    """Run the stored model on preprocessed rows and return JSON-native predictions."""
+    model = artifact.get('model')
+    preds = model.predict(X_scaled)
+    # Decode classification labels if encoder exists
+    if artifact.get('model_type') == 'classification' and 'target' in artifact.get('label_encoders', {}):
+        target_enc = artifact['label_encoders']['target']
+        preds = target_enc.inverse_transform(preds)
+    # Convert numpy types to native
+    return [p.item() if hasattr(p, 'item') else p for p in preds]
+
+def resolve_model_id(filename: str, model_id: Optional[int]) -> Optional[int]:
+    if model_id is not None or not filename:
+        return model_id
+    try:
+        meta = fetch_model_by_file(filename)
+        if meta:
+            return meta.get('id')
+    except Exception:
+        pass
+    return None
+
+def sample_resource_usage():
+    """Return (cpu_percent, ram_mb) for the current process, best effort."""
+    try:
+        cpu_percent_val = psutil.cpu_percent(interval=None)
+    except Exception:
+        cpu_percent_val = None
+    try:
+        process = psutil.Process(os.getpid())
+        ram_mb_val = process.memory_info().rss / (1024 * 1024)
+    except Exception:
+        try:
+            ram_mb_val = psutil.virtual_memory().used / (1024 * 1024)
+        except Exception:
+            ram_mb_val = None
+    return cpu_percent_val, ram_mb_val
+
+def usage_summary(model_id: int) -> Dict[str, Any]:
+    """Lightweight usage summary returned alongside predictions (served from in-memory aggregates)."""
+    usage = usage_aggregates.summary(model_id)
+    return {
+        'total_predictions': usage.get('total_predictions'),
+        'total_copies': usage.get('total_copies'),
+        'avg_latency_ms': usage.get('avg_latency_ms'),
+        'success_rate': usage.get('success_rate'),
+        'last_used_at': usage.get('last_used_at'),
+    }
 
 @app.route('/api/predict', methods=['POST'])
 def predict():
     """Load saved model artifact and run inference on provided features."""
     start_time = time.perf_counter()
     latency_ms = None
-    cpu_percent_val = None
-    ram_mb_val = None
     success = False
     status_code = 200
     resolved_model_id = None
@@ -961,28 +3772,15 @@ def predict():
             raise ValueError('model_file is required')
         if not isinstance(features, dict):
             raise ValueError('features must be a JSON object')
-        if resolved_model_id is None and filename:
-            try:
-                meta = fetch_model_by_file(filename)
-                if meta:
-                    resolved_model_id = meta.get('id')
-            except Exception:
-                resolved_model_id = None
+        resolved_model_id = resolve_model_id(filename, resolved_model_id)
         models_dir = os.path.join(os.path.dirname(__file__), 'models')
         file_path = os.path.join(models_dir, filename)
         if not os.path.exists(file_path):
             status_code = 404
             raise FileNotFoundError('Model file not found')
-        artifact = joblib.load(file_path)
+        artifact = artifact_cache.get(file_path)
         X_scaled = preprocess_payload(features, artifact)
-        model = artifact.get('model')
-        preds = model.predict(X_scaled)
-        # Decode classification labels if encoder exists
-        if artifact.get('model_type') == 'classification' and 'target' in artifact.get('label_encoders', {}):
-            target_enc = artifact['label_encoders']['target']
-            preds = target_enc.inverse_transform(preds)
-        # Convert numpy types to native
-        preds_list = [p.item() if hasattr(p, 'item') else p for p in preds]
+        preds_list = predict_with_artifact(artifact, X_scaled)
         success = True
         response_payload = {'success': True, 'predictions': preds_list}
     except Exception as e:
@@ -991,18 +3789,7 @@ def predict():
         response_payload = {'success': False, 'error': str(e)}
     finally:
         latency_ms = round((time.perf_counter() - start_time) * 1000, 3)
-        try:
-            cpu_percent_val = psutil.cpu_percent(interval=None)
-        except Exception:
-            cpu_percent_val = None
-        try:
-            process = psutil.Process(os.getpid())
-            ram_mb_val = process.memory_info().rss / (1024 * 1024)
-        except Exception:
-            try:
-                ram_mb_val = psutil.virtual_memory().used / (1024 * 1024)
-            except Exception:
-                ram_mb_val = None
+        cpu_percent_val, ram_mb_val = sample_resource_usage()
         try:
             log_api_event(resolved_model_id, filename, 'predict', success, latency_ms, cpu_percent_val, ram_mb_val)
         except Exception as log_err:
@@ -1011,14 +3798,77 @@ def predict():
     # Optionally return a lightweight usage summary
     try:
         if success and resolved_model_id is not None:
-            usage = get_api_stats(resolved_model_id)
-            response_payload['usage'] = {
-                'total_predictions': usage.get('total_predictions'),
-                'total_copies': usage.get('total_copies'),
-                'avg_latency_ms': usage.get('avg_latency_ms'),
-                'success_rate': usage.get('success_rate'),
-                'last_used_at': usage.get('last_used_at'),
-            }
+            response_payload['usage'] = usage_summary(resolved_model_id)
+    except Exception as e:
+        print('fetch usage stats failed:', str(e))
+
+    return jsonify(response_payload), (200 if success else status_code)
+
+PREDICT_MAX_BATCH_SIZE = int(os.environ.get("PREDICT_MAX_BATCH_SIZE", "10000"))
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many rows in one call: one encoding pass, one model.predict, one usage event.
+
+    Body: {"model_file": ..., "model_id": ..., "rows": [{...}, ...]} or
+          {"model_file": ..., "model_id": ..., "columns": {"feat": [...], ...}}
+    """
+    start_time = time.perf_counter()
+    success = False
+    status_code = 200
+    resolved_model_id = None
+    filename = None
+    n_rows = 0
+    response_payload: Dict[str, Any] = {}
+    try:
+        data = request.json or {}
+        filename = data.get('model_file')
+        resolved_model_id = data.get('model_id')
+        batch = data.get('rows') if data.get('rows') is not None else data.get('columns')
+        if not filename:
+            raise ValueError('model_file is required')
+        if batch is None:
+            raise ValueError('rows or columns is required')
+        resolved_model_id = resolve_model_id(filename, resolved_model_id)
+        models_dir = os.path.join(os.path.dirname(__file__), 'models')
+        file_path = os.path.join(models_dir, filename)
+        if not os.path.exists(file_path):
+            status_code = 404
+            raise FileNotFoundError('Model file not found')
+        artifact = artifact_cache.get(file_path)
+        if isinstance(batch, list):
+            n_rows = len(batch)
+        elif isinstance(batch, dict):
+            n_rows = max((len(v) for v in batch.values() if isinstance(v, list)), default=0)
+        else:
+            raise ValueError('batch must be a list of rows or an object of columns')
+        if n_rows == 0:
+            raise ValueError('batch is empty')
+        if n_rows > PREDICT_MAX_BATCH_SIZE:
+            status_code = 413
+            raise ValueError(f'batch size {n_rows} exceeds the limit of {PREDICT_MAX_BATCH_SIZE} rows')
+        X_scaled = preprocess_batch(batch, artifact)
+        preds_list = predict_with_artifact(artifact, X_scaled)
+        success = True
+        response_payload = {'success': True, 'count': n_rows, 'predictions': preds_list}
+    except Exception as e:
+        if status_code == 200:
+            status_code = 400
+        response_payload = {'success': False, 'error': str(e)}
+    finally:
+        latency_ms = round((time.perf_counter() - start_time) * 1000, 3)
+        cpu_percent_val, ram_mb_val = sample_resource_usage()
+        try:
+            log_api_event(
+                resolved_model_id, filename, 'predict', success, latency_ms, cpu_percent_val, ram_mb_val,
+                row_count=max(n_rows, 1),
+            )
+        except Exception as log_err:
+            print('log api event failed:', str(log_err))
+
+    try:
+        if success and resolved_model_id is not None:
+            response_payload['usage'] = usage_summary(resolved_model_id)
     except Exception as e:
         print('fetch usage stats failed:', str(e))
 
@@ -1026,20 +3876,40 @@ def predict():
 
 @app.route('/api/parse-csv', methods=['POST'])
 def parse_csv():
+    """Columns, sample rows, row count and dtypes of a CSV.
+
+    Options (JSON body, form fields or query string): preview=true reads only the
+    first preview_kb KB and estimates the row count; profile=true adds per-column
+    null counts, approximate distinct counts and quantiles computed in one streaming
+    pass (the row count is then exact). Profiling implies preview: the columns and
+    dtypes come from the sample, so the CSV is only read in full once.
+    """
     try:
-        csv_data = request.json.get('csv_data')
         try:
-            df = robust_read_csv(csv_data)
+            with request_csv_source() as (csv_string, path, fields):
+                preview = str(fields.get('preview', '')).lower() in ('1', 'true', 'yes')
+                profile = str(fields.get('profile', '')).lower() in ('1', 'true', 'yes')
+                if preview or profile:
+                    preview_kb = int(fields.get('preview_kb') or PREVIEW_KB)
+                    payload = preview_csv(csv_string, path, preview_bytes=max(1, preview_kb) * 1024)
+                else:
+                    df = robust_read_csv(csv_string, path=path)
+                    payload = {
+                        'columns': df.columns.tolist(),
+                        'sample_data': df.head(5).to_dict('records'),
+                        'row_count': len(df),
+                        'column_types': df.dtypes.astype(str).to_dict()
+                    }
+                if profile:
+                    numeric = [c for c, t in payload['column_types'].items() if t.startswith(('int', 'float', 'uint'))]
+                    payload['row_count'], payload['profile'] = profile_csv(csv_string, path, numeric_columns=numeric)
+                    payload['row_count_exact'] = True
+        except UploadError as e:
+            return jsonify({'success': False, 'error': str(e)}), e.status
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 400
         
-        return jsonify({
-            'success': True,
-            'columns': df.columns.tolist(),
-            'sample_data': df.head(5).to_dict('records'),
-            'row_count': len(df),
-            'column_types': df.dtypes.astype(str).to_dict()
-        })
+        return jsonify({'success': True, **payload})
     
     except Exception as e:
         return jsonify({
@@ -1047,12 +3917,81 @@ def parse_csv():
             'error': str(e)
         }), 400
 
+@app.route('/api/datasets', methods=['POST'])
+def upload_dataset():
+    """Parse a CSV once and store it; later calls reference the returned dataset_id."""
+    try:
+        try:
+            df, fields = dataframe_from_request()
+        except UploadError as e:
+            return jsonify({'success': False, 'error': str(e)}), e.status
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        meta = save_dataset(df, name=fields.get('name'))
+        return jsonify({
+            'success': True,
+            **dataset_summary(meta),
+            'sample_data': df.head(5).to_dict('records'),
+        }), 201
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/api/datasets', methods=['GET'])
+def get_datasets():
+    return jsonify({'success': True, 'datasets': list_datasets()})
+
+@app.route('/api/datasets/<dataset_id>/preview', methods=['GET'])
+def preview_dataset(dataset_id: str):
+    """Columns, types, row count and a window of rows (?offset=0&limit=5) of a stored dataset."""
+    try:
+        meta = load_dataset_meta(dataset_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    offset = max(0, request.args.get('offset', default=0, type=int))
+    limit = max(1, min(request.args.get('limit', default=5, type=int), 1000))
+    df = load_dataset(dataset_id, rows=slice(offset, offset + limit))
+    return jsonify({
+        'success': True,
+        **dataset_summary(meta),
+        'offset': offset,
+        'sample_data': df.to_dict('records'),
+    })
+
+@app.route('/api/datasets/<dataset_id>', methods=['DELETE'])
+def remove_dataset(dataset_id: str):
+    try:
+        deleted = delete_dataset(dataset_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if not deleted:
+        return jsonify({'success': False, 'error': 'Dataset not found'}), 404
+    return jsonify({'success': True})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy'})
 
+@app.route('/api/metrics', methods=['GET'])
+def internal_metrics():
+    """Expose in-process counters (artifact cache, ...) for scraping."""
+    with _db_stats_lock:
+        pool_stats = dict(db_pool_stats)
+    return jsonify({
+        'success': True,
+        'artifact_cache': artifact_cache.stats(),
+        'usage_writer': usage_writer.stats(),
+        'usage_aggregates': usage_aggregates.stats(),
+        'last_usage_compaction': last_compaction or None,
+        'training_jobs': training_jobs.stats(),
+        'training_result_cache': training_result_cache.stats(),
+        'db_pool': {'pool_size': DB_POOL_SIZE, 'schema_ready': _schema_ready, **pool_stats},
+    })
+
 if __name__ == '__main__':
     # Allow overriding bind host/port via environment to avoid local port conflicts (e.g., VPN/IT policies).
     port = int(os.environ.get("PORT", "5000"))
     host = os.environ.get("HOST", "0.0.0.0")
+    bootstrap_schema()
     app.run(host=host, debug=True, port=port)
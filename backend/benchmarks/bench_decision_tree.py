@@ -0,0 +1,139 @@
+"""Benchmark the custom decision tree split search against the previous implementation.
+
+Usage (from backend/):
+    python benchmarks/bench_decision_tree.py --rows 10000 100000 1000000 --legacy-max-rows 10000
+
+The legacy search (one masked copy of X and y per candidate threshold) is
+quadratic in rows per feature, so it is only timed up to --legacy-max-rows;
+where both run, their predictions are compared. The histogram mode
+(--max-bins) is timed too, with its accuracy/R^2 next to the exact tree's.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from algorithms.classification.decision_tree_classifier import DecisionTreeClassifierCustom, Node  # noqa: E402
+from algorithms.regression.decision_tree_regressor import DecisionTreeRegressorCustom, NodeRegressor  # noqa: E402
+
+
+class LegacyTreeClassifier(DecisionTreeClassifierCustom):
+    """Split search as it was before the sort-based sweep (kept for comparison)."""
+
+    def best_split(self, X, y):
+        best_gini, best_feature, best_threshold = float('inf'), None, None
+        for feature in range(X.shape[1]):
+            for threshold in np.unique(X[:, feature]):
+                X_left, X_right, y_left, y_right = self.split(X, y, feature, threshold)
+                if len(y_left) == 0 or len(y_right) == 0:
+                    continue
+                gini = (len(y_left) / len(y)) * self.gini(y_left) + \
+                       (len(y_right) / len(y)) * self.gini(y_right)
+                if gini < best_gini:
+                    best_gini, best_feature, best_threshold = gini, feature, threshold
+        return best_feature, best_threshold
+
+    def build_tree(self, X, y, depth=0, idx=None):
+        if idx is not None:
+            # fit(sample_indices=...) passes the root's rows; the legacy search copies them
+            X, y = X[idx], y[idx]
+        if depth >= self.max_depth or X.shape[0] < self.min_samples_split or len(np.unique(y)) == 1:
+            return Node(value=np.argmax(np.bincount(y)))
+        feature, threshold = self.best_split(X, y)
+        if feature is None:
+            return Node(value=np.argmax(np.bincount(y)))
+        X_left, X_right, y_left, y_right = self.split(X, y, feature, threshold)
+        return Node(feature, threshold, self.build_tree(X_left, y_left, depth + 1),
+                    self.build_tree(X_right, y_right, depth + 1))
+
+
+class LegacyTreeRegressor(DecisionTreeRegressorCustom):
+    """Split search as it was before the prefix-sum sweep (kept for comparison)."""
+
+    def best_split(self, X, y):
+        best_mse, best_feature, best_threshold = float('inf'), None, None
+        for feature in range(X.shape[1]):
+            for threshold in np.unique(X[:, feature]):
+                X_left, X_right, y_left, y_right = self.split(X, y, feature, threshold)
+                if len(y_left) == 0 or len(y_right) == 0:
+                    continue
+                mse = (len(y_left) / len(y)) * np.var(y_left) + \
+                      (len(y_right) / len(y)) * np.var(y_right)
+                if mse < best_mse:
+                    best_mse, best_feature, best_threshold = mse, feature, threshold
+        return best_feature, best_threshold
+
+    def build_tree(self, X, y, depth=0, idx=None):
+        if idx is not None:
+            # fit(sample_indices=...) passes the root's rows; the legacy search copies them
+            X, y = X[idx], y[idx]
+        if depth >= self.max_depth or X.shape[0] < self.min_samples_split:
+            return NodeRegressor(value=np.mean(y))
+        feature, threshold = self.best_split(X, y)
+        if feature is None:
+            return NodeRegressor(value=np.mean(y))
+        X_left, X_right, y_left, y_right = self.split(X, y, feature, threshold)
+        return NodeRegressor(feature, threshold, self.build_tree(X_left, y_left, depth + 1),
+                             self.build_tree(X_right, y_right, depth + 1))
+
+
+def make_data(n_rows, n_features, task, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    # a few low-cardinality columns, like encoded categoricals
+    X[:, ::3] = np.round(X[:, ::3] * 3)
+    signal = X[:, 0] + 0.5 * X[:, 1] - X[:, 2] * X[:, 3]
+    if task == 'classification':
+        y = np.digitize(signal + rng.normal(scale=0.5, size=n_rows), [-1.0, 0.0, 1.0])
+    else:
+        y = signal + rng.normal(scale=0.1, size=n_rows)
+    return X, y
+
+
+def timed(label, model, X, y):
+    start = time.perf_counter()
+    model.fit(X, y)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} fit {elapsed:9.3f} s")
+    return model
+
+
+def score(model, X, y, task):
+    predictions = model.predict(X)
+    if task == 'classification':
+        return np.mean(predictions == y)
+    return 1 - np.sum((y - predictions) ** 2) / np.sum((y - np.mean(y)) ** 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--task', choices=['classification', 'regression'], default='classification')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--max-depth', type=int, default=6)
+    parser.add_argument('--legacy-max-rows', type=int, default=10_000)
+    parser.add_argument('--max-bins', type=int, default=255)
+    args = parser.parse_args()
+
+    new_cls, legacy_cls = (
+        (DecisionTreeClassifierCustom, LegacyTreeClassifier) if args.task == 'classification'
+        else (DecisionTreeRegressorCustom, LegacyTreeRegressor)
+    )
+    for n_rows in args.rows:
+        X, y = make_data(n_rows, args.features, args.task)
+        print(f"{args.task}: {n_rows:,} rows x {args.features} features, max_depth={args.max_depth}")
+        new = timed('new', new_cls(max_depth=args.max_depth), X, y)
+        hist = timed('hist', new_cls(max_depth=args.max_depth, max_bins=args.max_bins), X, y)
+        X_eval, y_eval = X[:10_000], y[:10_000]
+        print(f"  train score on 10k rows: exact {score(new, X_eval, y_eval, args.task):.4f}, "
+              f"hist {score(hist, X_eval, y_eval, args.task):.4f}")
+        if n_rows <= args.legacy_max_rows:
+            legacy = timed('legacy', legacy_cls(max_depth=args.max_depth), X, y)
+            print('  identical predictions:', np.array_equal(new.predict(X_eval), legacy.predict(X_eval)))
+
+
+if __name__ == '__main__':
+    main()
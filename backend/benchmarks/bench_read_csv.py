@@ -0,0 +1,92 @@
+"""Benchmark robust_read_csv against the previous python-engine implementation.
+
+Usage (from backend/):
+    python benchmarks/bench_read_csv.py --mb 300 --sep ";"
+
+Generates a synthetic CSV of roughly the requested size (numeric and text
+columns), then times the legacy parser, the new parser on the string and on
+the file, and the new parser restricted to a few columns (usecols), as done
+when training.
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from app import robust_read_csv  # noqa: E402
+
+
+def legacy_read_csv(csv_string):
+    """robust_read_csv as it was before the fast path (kept for comparison)."""
+    try:
+        return pd.read_csv(io.StringIO(csv_string), sep=None, engine="python")
+    except Exception as e_auto:
+        last_exc = e_auto
+        for sep in [';', ',', '\t']:
+            try:
+                return pd.read_csv(io.StringIO(csv_string), sep=sep)
+            except Exception as e:
+                last_exc = e
+        raise last_exc
+
+
+def make_csv(target_mb, sep, seed=0):
+    rng = np.random.default_rng(seed)
+    chunks, size, n = [], 0, 100_000
+    header = True
+    while size < target_mb * 1024 * 1024:
+        df = pd.DataFrame({
+            'age': rng.integers(18, 90, n),
+            'income': rng.normal(50_000, 15_000, n).round(2),
+            'score': rng.random(n),
+            'city': rng.choice(['Paris', 'Lyon', 'Dakar', 'Bamako', 'Abidjan'], n),
+            'segment': rng.choice(['A', 'B', 'C'], n),
+            'churn': rng.choice(['yes', 'no'], n),
+        })
+        chunk = df.to_csv(index=False, sep=sep, header=header)
+        header = False
+        chunks.append(chunk)
+        size += len(chunk)
+    return ''.join(chunks)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.2f} s  ({len(df):,} rows x {df.shape[1]} cols)")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mb', type=float, default=200, help='approximate CSV size in MB')
+    parser.add_argument('--sep', default=';', help='field separator of the generated CSV')
+    parser.add_argument('--skip-legacy', action='store_true', help='do not time the (slow) legacy parser')
+    args = parser.parse_args()
+
+    csv_string = make_csv(args.mb, args.sep)
+    print(f"CSV size: {len(csv_string) / 1024 / 1024:.1f} MB, separator {args.sep!r}")
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+        f.write(csv_string)
+        path = f.name
+    try:
+        if not args.skip_legacy:
+            legacy = timed('legacy (python engine)', lambda: legacy_read_csv(csv_string))
+        fast = timed('robust_read_csv (string)', lambda: robust_read_csv(csv_string))
+        timed('robust_read_csv (file)', lambda: robust_read_csv(path=path))
+        timed('robust_read_csv (usecols=3)', lambda: robust_read_csv(path=path, usecols=['age', 'city', 'churn']))
+        if not args.skip_legacy:
+            print('same result as legacy:', legacy.equals(fast))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()